@@ -1,23 +1,204 @@
+import argparse
+import json
+import numbers
+
 from genetic import Genetic
+from policy import ACTIVATIONS, BACKENDS
+
+CHOICES = {"engine": ("population", "organism"),
+           "selection": ("roulette", "sus", "rank", "tournament"),
+           "mutation_operator": ("uniform", "gaussian"),
+           "fitness_aggregation": ("mean", "min", "quantile"),
+           "migration_topology": ("ring", "full"),
+           "food_placement": ("uniform", "jitter", "poisson"),
+           "activation": ACTIVATIONS,
+           "output_activation": ACTIVATIONS,
+           "policy_backend": BACKENDS}
+# Settings whose default does not show their type, the others take the type of their default.
+TYPES = {"seed": (numbers.Integral, type(None)),
+         "hidden_layers": (list, tuple, type(None)),
+         "profile_generation": (numbers.Integral, type(None)),
+         "replay_dir": (str, type(None)),
+         "stats_file": (str, type(None)),
+         "output_dir": (str, type(None)),
+         "food_spacing": numbers.Real}
+POSITIVE = ("population_size", "input_nodes_size", "hidden_nodes_size", "hidden_nodes_2_size", "out_nodes_size",
+            "workers", "environments", "islands", "render_every", "plot_every", "replay_every", "migration_interval",
+            "tournament_size", "stable_ticks")
+NON_NEGATIVE = ("block_numbers", "food_numbers", "food_spacing", "max_generation", "mutation_scale", "migration_size",
+                "checkpoint_every", "max_ticks", "stagnation_ticks", "stable_top_k", "replay_best", "seed",
+                "profile_generation")
+FRACTIONS = ("mutation_rate", "fitness_quantile")
 
 
-def main():
-    settings = {
+def default_settings():
+    return {
         "population_size": 100,
         "block_numbers": 10,
         "food_numbers": 150,
+        "map_size": (800, 800),
+        "food_placement": "uniform",
+        "food_spacing": 20,
         "max_generation": 30,
         "input_nodes_size": 7,
         "hidden_nodes_size": 20,
         "hidden_nodes_2_size": 50,
         "out_nodes_size": 2,
+        "hidden_layers": None,
+        "biases": False,
+        "activation": "tanh",
+        "output_activation": "tanh",
+        "policy_backend": "numpy",
         "mutation_rate": 0.01,
         "elite_size": 10,
+        "elitism": 0,
+        "fitness_cache": False,
         "always_generate_environment": True,
-        "draw_stats": False
+        "draw_stats": False,
+        "stats_plot": "stats.png",
+        "plot_every": 1,
+        "headless": False,
+        "render_every": 1,
+        "render_best_only": False,
+        "cache_background": True,
+        "seed": None,
+        "engine": "population",
+        "workers": 1,
+        "environments": 1,
+        "fitness_aggregation": "mean",
+        "fitness_quantile": 0.25,
+        "islands": 1,
+        "migration_interval": 5,
+        "migration_size": 2,
+        "migration_topology": "ring",
+        "mutation_operator": "uniform",
+        "mutation_scale": 0.1,
+        "selection": "roulette",
+        "tournament_size": 3,
+        "checkpoint_every": 0,
+        "checkpoint_file": "checkpoint.npz",
+        "max_ticks": 0,
+        "stagnation_ticks": 0,
+        "stable_top_k": 0,
+        "stable_ticks": 300,
+        "replay_dir": None,
+        "replay_every": 1,
+        "replay_best": 0,
+        "stats_file": None,
+        "profile_generation": None,
+        "output_dir": None
     }
-    genetic = Genetic(settings)
-    genetic.execute()
+
+
+def setting_type(name, default):
+    if name in TYPES:
+        return TYPES[name]
+    if isinstance(default, bool):
+        return bool
+    if isinstance(default, numbers.Integral):
+        return numbers.Integral
+    if isinstance(default, numbers.Real):
+        return numbers.Real
+    if isinstance(default, tuple):
+        return list, tuple
+    return type(default)
+
+
+def is_valid_type(value, expected):
+    # bool is an Integral too, it is only accepted where a bool is expected.
+    if isinstance(value, bool):
+        return expected is bool
+    return isinstance(value, expected)
+
+
+def check_sizes(name, sizes, count=None):
+    if (count is not None and len(sizes) != count) or not all(
+            is_valid_type(size, numbers.Integral) and size >= 1 for size in sizes):
+        raise ValueError('{} should be {} positive integers, got {!r}'.format(name, count or 'a list of', sizes))
+
+
+def validate_settings(settings):
+    defaults = default_settings()
+    unknown = sorted(set(settings) - set(defaults))
+    if unknown:
+        raise ValueError('Unknown settings: {}'.format(', '.join(unknown)))
+    missing = sorted(set(defaults) - set(settings))
+    if missing:
+        raise ValueError('Missing settings: {}'.format(', '.join(missing)))
+    for name, value in settings.items():
+        expected = setting_type(name, defaults[name])
+        if not is_valid_type(value, expected):
+            names = ' or '.join(kind.__name__ for kind in (expected if isinstance(expected, tuple) else (expected,)))
+            raise ValueError('{} should be {}, got {!r}'.format(name, names, value))
+        if name in CHOICES and value not in CHOICES[name]:
+            raise ValueError('Unknown {} {}, use one of {}'.format(name, value, ', '.join(CHOICES[name])))
+        if name in POSITIVE and value < 1:
+            raise ValueError('{} should be at least 1, got {}'.format(name, value))
+        if name in NON_NEGATIVE and value is not None and value < 0:
+            raise ValueError('{} should not be negative, got {}'.format(name, value))
+        if name in FRACTIONS and not 0 <= value <= 1:
+            raise ValueError('{} should be between 0 and 1, got {}'.format(name, value))
+    check_sizes('map_size', settings["map_size"], 2)
+    if settings["hidden_layers"] is not None:
+        check_sizes('hidden_layers', settings["hidden_layers"])
+    if not 1 <= settings["elite_size"] <= settings["population_size"]:
+        raise ValueError('elite_size should be between 1 and population_size, got {}'.format(settings["elite_size"]))
+    if not 0 <= settings["elitism"] <= settings["population_size"]:
+        raise ValueError('elitism should be between 0 and population_size, got {}'.format(settings["elitism"]))
+    return settings
+
+
+def load_settings(config_file=None, **changes):
+    # Defaults, then the JSON config file, then the changes, every level only lists the settings it changes.
+    settings = default_settings()
+    if config_file:
+        with open(config_file) as stream:
+            settings.update(json.load(stream))
+    settings.update(changes)
+    return validate_settings(settings)
+
+
+def run(settings=None, checkpoint_file=None, **changes):
+    settings = validate_settings(dict(settings or default_settings(), **changes))
+    return Genetic(settings).execute(checkpoint_file)
+
+
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description='Evolve organisms that find foods and avoid blocks.')
+    parser.add_argument('checkpoint', nargs='?', help='resume the run from this checkpoint file')
+    parser.add_argument('--config', help='JSON file with the settings that differ from the defaults')
+    parser.add_argument('--mode', choices=('window', 'headless'),
+                        help='`headless` runs without a display window, same as --headless true')
+    parser.add_argument('--print-settings', action='store_true', help='print the final settings as JSON and exit')
+    group = parser.add_argument_group('settings', 'any setting of the README table, the value is read as JSON '
+                                                  'when it can be, for example --hidden-layers [64,64]')
+    for name in default_settings():
+        group.add_argument('--' + name.replace('_', '-'), dest=name, type=parse_value, metavar='VALUE',
+                           default=argparse.SUPPRESS)
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = vars(parse_args(args))
+    checkpoint, config, mode, print_settings = (args.pop(name) for name in ('checkpoint', 'config', 'mode',
+                                                                            'print_settings'))
+    if mode:
+        args["headless"] = mode == 'headless'
+    try:
+        settings = load_settings(config, **args)
+    except ValueError as error:
+        raise SystemExit('Invalid settings: {}'.format(error))
+    if print_settings:
+        print(json.dumps(settings, indent=2))
+        return
+    run(settings, checkpoint)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,48 @@
+import math
+import struct
+from functools import lru_cache
+from os import path
+
+resources_dir = path.join(path.dirname(__file__), 'resources')
+
+ROTATION_STEP = 2
+
+
+@lru_cache(maxsize=None)
+def image_size(name):
+    with open(path.join(resources_dir, name), 'rb') as image_file:
+        header = image_file.read(24)
+    return struct.unpack('>II', header[16:24])
+
+
+def rotated_size(size, angle):
+    # Same bounding box as pygame.transform.rotozoom, so collisions do not depend on a rendered image.
+    width, height = size
+    if abs(angle) <= 0.001:
+        return width, height
+    rads = math.radians(angle)
+    cos_x, cos_y = math.cos(rads) * (width // 2), math.cos(rads) * (height // 2)
+    sin_x, sin_y = math.sin(rads) * (width // 2), math.sin(rads) * (height // 2)
+    half_width = max(math.ceil(max(abs(cos_x + sin_y), abs(cos_x - sin_y))), 1)
+    half_height = max(math.ceil(max(abs(sin_x + cos_y), abs(sin_x - cos_y))), 1)
+    return 2 * half_width, 2 * half_height
+
+
+@lru_cache(maxsize=None)
+def load_image(name):
+    import pygame
+    image = pygame.image.load(path.join(resources_dir, name))
+    if pygame.display.get_surface():
+        image = image.convert_alpha()
+    return image
+
+
+@lru_cache(maxsize=None)
+def load_rotated_image(name, angle):
+    import pygame
+    return pygame.transform.rotozoom(load_image(name), angle, 1)
+
+
+def rotated_image(name, angle):
+    return load_rotated_image(name, round(angle / ROTATION_STEP) * ROTATION_STEP % 360)
+
@@ -0,0 +1,139 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+
+import numpy
+
+from ai import default_settings
+from genetic import Genetic
+from genome import Genome
+
+SWEEP = [("population_size", [300, 1000, 3000]),
+         ("block_numbers", [30, 100]),
+         ("food_numbers", [500, 1000]),
+         ("hidden_nodes", [(64, 128), (128, 256)])]
+
+
+def benchmark_settings(**changes):
+    settings = default_settings()
+    settings.update(headless=True, seed=0, max_generation=2, draw_stats=False, stats_file=None,
+                    checkpoint_every=0, profile_generation=None)
+    settings.update(changes)
+    return settings
+
+
+def cases(quick):
+    yield 'base', {}
+    for name, values in SWEEP:
+        for value in values[:1] if quick else values:
+            if name == "hidden_nodes":
+                yield '{}={}x{}'.format(name, *value), dict(hidden_nodes_size=value[0], hidden_nodes_2_size=value[1])
+            else:
+                yield '{}={}'.format(name, value), {name: value}
+
+
+def run_case(settings):
+    genetic = Genetic(settings)
+    start = perf_counter()
+    history = genetic.run()
+    elapsed = perf_counter() - start
+    simulate_time = sum(stat['simulate_time'] for stat in history)
+    return dict(ticks_per_second=sum(stat['ticks'] for stat in history) / simulate_time,
+                generations_per_second=len(history) / elapsed,
+                peak_rss_kb=max(stat['max_rss_kb'] or 0 for stat in history))
+
+
+def run_case_history(settings):
+    return [(stat['ticks'], stat['best_fitness'], stat['sum_fitness']) for stat in Genetic(settings).run()]
+
+
+def run_isolated(settings):
+    # A fresh process per case, so the peak memory belongs to that case alone.
+    with ProcessPoolExecutor(1) as executor:
+        return executor.submit(run_case, settings).result()
+
+
+def generation_fitness(settings):
+    genetic = Genetic(settings)
+    genomes = Genome.random(genetic.layer_shapes, settings["population_size"], genetic.rng)
+    genetic.stat.update(best_genome=None, ticks=0)
+    fitness, exit_simulation = genetic.simulate(genomes, False)
+    if genetic.parallel_evaluator:
+        genetic.parallel_evaluator.close()
+    return fitness
+
+
+def check_reference(settings, tolerance, agreement):
+    # Both engines run the same float32 networks, every organism has to match unless a lower agreement is asked for.
+    reference = generation_fitness(dict(settings, engine="organism", workers=1))
+    optimized = generation_fitness(dict(settings, engine="population", workers=1))
+    matching = numpy.isclose(reference, optimized, rtol=0, atol=tolerance).mean()
+    print('reference vs population: {:.1%} of organisms within {} (max difference {:.4g})'.format(
+        matching, tolerance, numpy.abs(reference - optimized).max()))
+    passed = matching >= agreement
+
+    serial = run_case_history(dict(settings, engine="population", workers=1))
+    parallel = run_case_history(dict(settings, engine="population", workers=2))
+    same_trajectory = serial == parallel
+    print('population vs 2 workers: fitness trajectories {}'.format('match' if same_trajectory else 'differ'))
+    return passed and same_trajectory
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratio = result['ticks_per_second'] / baseline[name]['ticks_per_second']
+        print('{:<28} {:>7.2f}x baseline ticks/s'.format(name, ratio))
+        if ratio < 1 - tolerance:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Headless, seeded benchmark of the simulation and evolution.')
+    parser.add_argument('--quick', action='store_true', help='run only the first value of every sweep')
+    parser.add_argument('--generations', type=int, default=2)
+    parser.add_argument('--engine', default="population", choices=["population", "organism"])
+    parser.add_argument('--baseline', help='compare ticks/s with the results saved in this file')
+    parser.add_argument('--save', help='save the results to this file as a new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.1, help='allowed ticks/s slowdown against the baseline')
+    parser.add_argument('--check', action='store_true', help='check the population engine against the reference')
+    parser.add_argument('--check-tolerance', type=float, default=1e-6)
+    parser.add_argument('--check-agreement', type=float, default=1.0)
+    args = parser.parse_args()
+
+    passed = True
+    if args.check:
+        passed = check_reference(benchmark_settings(max_generation=args.generations), args.check_tolerance,
+                                 args.check_agreement)
+
+    results = {}
+    print('{:<28} {:>12} {:>12} {:>12}'.format('case', 'ticks/s', 'gens/s', 'peak MiB'))
+    for name, changes in cases(args.quick):
+        result = run_isolated(benchmark_settings(engine=args.engine, max_generation=args.generations, **changes))
+        results[name] = result
+        print('{:<28} {:>12.1f} {:>12.3f} {:>12.1f}'.format(name, result['ticks_per_second'],
+                                                            result['generations_per_second'],
+                                                            result['peak_rss_kb'] / 1024))
+
+    if args.baseline:
+        with open(args.baseline) as stream:
+            regressions = compare(results, json.load(stream), args.tolerance)
+        if regressions:
+            print('slower than the baseline: ' + ', '.join(regressions))
+            passed = False
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, 'w') as stream:
+            json.dump(results, stream, indent=2)
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == '__main__':
+    main()
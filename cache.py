@@ -0,0 +1,18 @@
+import hashlib
+
+
+class FitnessCache:
+
+    def __init__(self):
+        self.results = {}
+
+    def keys(self, genomes, layout_identity):
+        return [(hashlib.blake2b(row.tobytes(), digest_size=16).digest(), layout_identity) for row in genomes.buffer]
+
+    def lookup(self, keys):
+        return [self.results.get(key) for key in keys]
+
+    def update(self, results):
+        # Only the last generation is kept, the genomes that come back are its carried elites and their unmutated
+        # copies.
+        self.results = results
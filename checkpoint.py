@@ -0,0 +1,49 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy
+
+
+def encode(value):
+    return numpy.array(json.dumps(value))
+
+
+def decode(array):
+    return json.loads(str(array))
+
+
+def write(file, arrays, compressed=False):
+    # Written next to the target and renamed over it, a crash never leaves a half written checkpoint behind.
+    os.makedirs(os.path.dirname(os.path.abspath(file)), exist_ok=True)
+    temporary = file + '.tmp'
+    with open(temporary, 'wb') as stream:
+        (numpy.savez_compressed if compressed else numpy.savez)(stream, **arrays)
+        stream.flush()
+        os.fsync(stream.fileno())
+    os.replace(temporary, file)
+
+
+def read(file):
+    with numpy.load(file) as data:
+        return {key: data[key] for key in data.files}
+
+
+class Checkpointer:
+
+    def __init__(self):
+        self.executor = ThreadPoolExecutor(1)
+        self.pending = None
+
+    def save(self, file, arrays, compressed=False):
+        self.wait()
+        self.pending = self.executor.submit(write, file, arrays, compressed)
+
+    def wait(self):
+        if self.pending:
+            self.pending.result()
+            self.pending = None
+
+    def close(self):
+        self.wait()
+        self.executor.shutdown()
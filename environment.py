@@ -1,60 +1,74 @@
+import numpy
 
+import assets
 from block import Block
 from food import Food
+from world import WorldLayout, index_blocks, place_blocks, place_foods
 
 
 class Environment:
 
-    def __init__(self, game_display, settings, blocks=[], foods=[]):
+    def __init__(self, game_display, settings, rng=None):
         self.game_display = game_display
-        self.blocks = blocks
-        self.foods = foods
-        self.state = 0
         self.settings = settings
-        if foods and blocks:
-            self.set_current_food()
+        self.rng = numpy.random.default_rng() if rng is None else rng
+        self.map_size = tuple(settings["map_size"])
+        self.blocks = []
+        self.foods = {}
+        self.layout = None
+        self.background = None
 
     def generate_environment(self):
-        self.blocks = self.generate_blocks()
-        self.foods = self.generate_foods(self.blocks)
-
-    def generate_foods(self, blocks):
-        foods = []
-        for i in range(0, self.settings["food_numbers"]):
-            food = Food(self.game_display, blocks)
-            foods.append(food)
-        return foods
-
-    def generate_blocks(self):
-        blocks = []
-        for i in range(0, self.settings["block_numbers"]):
-            block = Block(self.game_display)
-            blocks.append(block)
-        return blocks
-
-    def set_current_food(self):
-        self.current_food = Food(self.game_display, self.blocks, self.foods[self.state].x, self.foods[self.state].y)
-
-    def get_food(self):
-        return self.current_food
-
-    def draw(self):
-        self.draw_blocks()
-        self.draw_food()
-
-    def draw_food(self):
-        self.get_food().update()
-        self.get_food().draw()
-
-    def draw_blocks(self):
-        for block in self.blocks:
-            block.draw()
+        block_positions = place_blocks(self.rng, self.settings["block_numbers"], self.map_size,
+                                       assets.image_size('block.png'))
+        block_grid = index_blocks(block_positions, self.block_radii(len(block_positions)))
+        food_positions = place_foods(self.rng, self.settings["food_numbers"], self.map_size, block_grid,
+                                     assets.image_size('food.png')[0], self.settings["food_placement"],
+                                     self.settings["food_spacing"])
+        self.build_layout(block_positions, food_positions)
+
+    def block_radii(self, count):
+        return numpy.full(count, assets.image_size('block.png')[0] / 2)
+
+    def build_layout(self, block_positions, food_positions):
+        block_positions = numpy.asarray(block_positions, dtype=float).reshape(-1, 2)
+        self.layout = WorldLayout(block_positions, self.block_radii(len(block_positions)), food_positions,
+                                  self.map_size)
+        self.blocks, self.foods, self.background = [], {}, None
 
-    def next_state(self):
-        self.state += 1
-        self.set_current_food()
+    def draw_food(self, food_index, is_best):
+        # Sprites are made for the foods that are drawn, a large world only has arrays.
+        food = self.foods.get(food_index)
+        if food is None:
+            food = self.foods[food_index] = Food(self.game_display, *self.layout.food_positions[food_index])
+        food.is_best = is_best
+        food.update()
+        food.draw()
+
+    def draw_background(self):
+        # The blocks never move, they are drawn once onto a cached copy of the background.
+        if self.background is None:
+            import pygame
+            self.background = pygame.Surface(self.game_display.get_size()).convert()
+            self.background.fill((255, 255, 255))
+            self.draw_blocks(self.background)
+        self.game_display.blit(self.background, (0, 0))
+
+    def draw_blocks(self, surface=None):
+        if not self.blocks:
+            self.blocks = [Block(self.game_display, x, y) for x, y in self.layout.block_positions]
+        for block in self.blocks:
+            block.draw(surface)
 
-    def reset_state(self):
-        self.state = 0
-        self.set_current_food()
+    def draw_organisms(self, positions, angles, food_indices, alive, best, best_only=False):
+        # The best organism is drawn last, on top of the others.
+        drawn = [] if best_only else [i for i in numpy.flatnonzero(alive) if i != best]
+        if best is not None and alive[best]:
+            drawn.append(best)
+        for i in drawn:
+            self.draw_food(food_indices[i], i == best)
+            self.draw_organism(positions[i], angles[i], i == best)
 
+    def draw_organism(self, position, angle, is_best):
+        image = assets.rotated_image('organism_best.png' if is_best else 'organism.png', -angle)
+        self.game_display.blit(image, image.get_rect(center=(round(position[0]), round(position[1]))))
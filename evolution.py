@@ -0,0 +1,67 @@
+import numpy
+
+from genome import Genome
+from selection import pairs, top
+
+
+def migration_targets(source, count, topology):
+    if topology == "full":
+        return [target for target in range(count) if target != source]
+    return [(source + 1) % count]
+
+
+def migrate(islands, topology, size):
+    # Every island sends copies of its best organisms and the receivers drop their worst ones for them.
+    migrants = [[] for island in islands]
+    for source, (genomes, fitness) in enumerate(islands):
+        best = top(fitness, size)
+        for target in migration_targets(source, len(islands), topology):
+            migrants[target].append((genomes.buffer[best], fitness[best]))
+    for (genomes, fitness), incoming in zip(islands, migrants):
+        buffers = numpy.concatenate([buffer for buffer, migrant_fitness in incoming])[:len(fitness)]
+        incoming_fitness = numpy.concatenate([migrant_fitness for buffer, migrant_fitness in incoming])[:len(fitness)]
+        worst = numpy.argsort(fitness, kind='stable')[:len(buffers)]
+        genomes.buffer[worst] = buffers
+        fitness[worst] = incoming_fitness
+
+
+class Evolution:
+
+    def __init__(self, settings, layer_shapes, rng):
+        self.settings = settings
+        self.layer_shapes = layer_shapes
+        self.rng = rng
+
+    def evolve(self, genomes, fitness, size=None):
+        size = size or self.settings["population_size"]
+        # The best `elitism` organisms are carried over unchanged, the rest of the generation is bred.
+        carried = top(fitness, min(self.settings["elitism"], size))
+        parents, parents_fitness = self.select_elite(genomes, fitness)
+        parent_pairs = pairs(self.settings["selection"], parents_fitness, size - len(carried),
+                             self.rng, self.settings["tournament_size"])
+
+        offsprings = self.crossover(parents[parent_pairs[:, 0]], parents[parent_pairs[:, 1]])
+        self.mutation(offsprings)
+
+        if not len(carried):
+            return offsprings
+        return Genome(self.layer_shapes, numpy.concatenate([genomes.buffer[carried], offsprings.buffer]))
+
+    def select_elite(self, genomes, fitness):
+        elites = top(fitness, self.settings["elite_size"])
+        return genomes[elites], fitness[elites]
+
+    def crossover(self, x, y):
+        swap = self.rng.random(x.buffer.shape) < 0.5
+        # Each pair keeps one of its two uniform-crossover children, which is x with either the swapped
+        # genes or the kept genes taken from y.
+        keep_second = self.rng.integers(2, size=(len(x), 1)).astype(bool)
+        return Genome(self.layer_shapes, numpy.where(swap ^ keep_second, y.buffer, x.buffer))
+
+    def mutation(self, offsprings):
+        mutated = self.rng.random(offsprings.buffer.shape) < self.settings["mutation_rate"]
+        if self.settings["mutation_operator"] == "gaussian":
+            offsprings.buffer[mutated] += self.rng.normal(0, self.settings["mutation_scale"], mutated.sum())
+        else:
+            offsprings.buffer[mutated] = self.rng.uniform(-1, 1, mutated.sum())
+        return offsprings
@@ -1,34 +1,17 @@
-from os import path
-
-import pygame
-from random import uniform
+import assets
 
 
 class Food:
 
-    def __init__(self, game_display, blocks, x=None, y=None):
+    def __init__(self, game_display, x, y):
         self.game_display = game_display
-        self.display_width, self.display_height = game_display.get_size()
-        resources_dir = path.join(path.dirname(__file__), 'resources')
-        self.base_food_image = pygame.image.load(resources_dir + '/food.png')
-        self.best_food_image = pygame.image.load(resources_dir + '/food_best.png')
-        self.display_padding = 20
-        self.blocks = blocks
+        self.image_width = assets.image_size('food.png')[0]
+        self.base_food_image = assets.load_image('food.png')
+        self.best_food_image = assets.load_image('food_best.png')
+        self.removed = False
         self.is_best = False
-        if x and y:
-            self.x, self.y = x, y
-            self.update()
-        else:
-            self.setup()
-
-    def setup(self):
-        self.x = uniform(self.display_padding, self.display_width - self.display_padding)
-        self.y = uniform(self.display_padding, self.display_height - self.display_padding)
+        self.x, self.y = x, y
         self.update()
-        for block in self.blocks:
-            if ((self.x - block.x) ** 2 + (self.y - block.y) ** 2) < (
-                    (block.image.get_width() / 2) + self.image.get_width()) ** 2:
-                self.setup()
 
     def update(self):
         self.image = self.best_food_image if self.is_best else self.base_food_image
@@ -38,6 +21,11 @@ class Food:
         self.game_display.blit(self.image, (self.rect.x, self.rect.y))
 
     def remove(self):
+        import pygame
+        if not self.removed:
+            self.base_food_image, self.best_food_image = self.base_food_image.copy(), self.best_food_image.copy()
+            self.removed = True
+            self.update()
         self.image.fill((255, 255, 255, 128), None, pygame.BLEND_RGBA_MULT)
 
     def get_position(self):
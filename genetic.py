@@ -1,53 +1,175 @@
-import operator
-import time
+import os
+from contextlib import nullcontext
 from copy import copy
 from os import path
 from pathlib import Path
-from random import randint
 
 import numpy
-import pygame
-from matplotlib import pyplot
 
-from block import Block
+from cache import FitnessCache
+from checkpoint import Checkpointer, decode, encode, read
 from environment import Environment
-from food import Food
-from organism import Organism
+from evolution import Evolution, migrate
+from genome import Genome
+from instrument import Instruments, profiled
+from parallel import ParallelEvaluator
+from policy import Network
+from population import Population
+from replay import ReplayRecorder
+from reporter import StatsReporter
+from scheduler import GenerationScheduler
+from selection import BestTracker
+from world import LayoutStack
 
 
 class Genetic:
 
     def __init__(self, settings):
         self.settings = settings
-        self.game_display, self.clock = self.initialize_simulation(800, 800)
+        self.rng = numpy.random.default_rng(self.settings["seed"])
+        # The worlds get their own stream, so the genomes do not depend on how many points the placement drew.
+        self.world_rng = numpy.random.default_rng(numpy.random.SeedSequence(self.settings["seed"]).spawn(1)[0])
+        self.game_display, self.clock = None, None
+        if not self.settings["headless"]:
+            self.game_display, self.clock = self.initialize_simulation(*self.settings["map_size"])
         self.resources_folder = path.join(path.dirname(__file__), 'resources')
-        self.saves_folder = path.join(path.dirname(__file__), 'saves')
+        self.saves_folder = self.settings["output_dir"] or path.join(path.dirname(__file__), 'saves')
         self.env = self.load_environment()
+        self.extra_layouts = []
+        self.layout = self.stack_layouts()
+        self.network = Network.from_settings(self.settings)
+        self.layer_shapes = self.network.layer_shapes
+        self.evolution = Evolution(self.settings, self.layer_shapes, self.rng)
+        self.parallel_evaluator = None
+        self.fitness_cache = None
+        if self.settings["fitness_cache"]:
+            if self.settings["stagnation_ticks"] or self.settings["stable_top_k"]:
+                raise ValueError('fitness_cache needs a fitness that depends only on the genome and the environments, '
+                                 'it cannot be used with stagnation_ticks or stable_top_k')
+            self.fitness_cache = FitnessCache()
+        self.checkpointer = None
+        self.replay = None
+        if self.settings["replay_dir"]:
+            self.replay = ReplayRecorder(self.checkpoint_path(self.settings["replay_dir"]), self.settings["replay_every"],
+                                         self.settings["replay_best"])
+        self.instruments = Instruments()
+        self.hud = None
+        if self.game_display is not None:
+            self.hud = self.create_hud()
         self.stat = {}
         self.stat_history = []
 
-    def execute(self):
-        organisms = []
-
-        for i in range(0, self.settings["population_size"]):
-            wih_init = numpy.random.uniform(-1, 1, (self.settings["hidden_nodes_size"], self.settings["input_nodes_size"]))
-            whh_init = numpy.random.uniform(-1, 1, (self.settings["hidden_nodes_2_size"], self.settings["hidden_nodes_size"]))
-            who_init = numpy.random.uniform(-1, 1, (self.settings["out_nodes_size"], self.settings["hidden_nodes_2_size"]))
-            organisms.append(Organism(self.game_display, wih_init, whh_init, who_init, self.env))
-
-        self.stat['best_organism'] = {}
-        for gen in range(0, self.settings["max_generation"]):
+    def create_hud(self):
+        from hud import Hud
+        return Hud(self.game_display, ['Elapsed ticks: {ticks}',
+                                           'Population size: {population_size}',
+                                           'Best fitness: {best_fitness}',
+                                           'Sum fitness: {sum_fitness}',
+                                           'Dead organism: {dead_organism} / {population_size}',
+                                           'Generation: {generation}',
+                                           'Eaten food: {eaten_food}'])
+
+    def execute(self, checkpoint_file=None):
+        history = self.run(checkpoint_file)
+        if self.game_display is not None:
+            import pygame
+            pygame.quit()
+        return history
+
+    def run(self, checkpoint_file=None, reporter=None):
+        islands = None
+        if checkpoint_file:
+            genomes, first_generation, islands = self.load_checkpoint(checkpoint_file)
+        else:
+            genomes = Genome.random(self.layer_shapes, self.settings["population_size"], self.rng)
+            first_generation = 0
+            self.stat['best_genome'] = None
+
+        reporter = reporter or self.create_reporter()
+        if self.settings["islands"] > 1:
+            self.run_islands(genomes, first_generation, reporter, islands)
+        else:
+            self.run_generations(genomes, first_generation, reporter)
+        if self.checkpointer:
+            self.checkpointer.close()
+        if self.replay:
+            self.replay.close()
+        if reporter:
+            reporter.close()
+        if self.parallel_evaluator:
+            self.parallel_evaluator.close()
+        return self.stat_history
+
+    def run_generations(self, genomes, first_generation, reporter):
+        for gen in range(first_generation, self.settings["max_generation"]):
             self.stat['generation'] = gen
-            self.stat['start_time'] = time.time()
-            organisms, exit_simulation = self.simulate(organisms)
-            if exit_simulation:
-                break
-            organisms = self.evolve(organisms)
-            self.stat_history.append(copy(self.stat))
-            if self.settings["draw_stats"]:
-                self.plot_stat()
-        pygame.quit()
-        quit()
+            self.stat['ticks'] = 0
+            self.instruments = Instruments()
+            profile = nullcontext()
+            if gen == self.settings["profile_generation"]:
+                profile = profiled(path.join(self.saves_folder, 'profile_{}'.format(gen)))
+            with profile:
+                with self.instruments.phase('simulate'):
+                    fitness, exit_simulation = self.simulate(genomes, self.is_rendered(gen), self.is_recorded(gen))
+                if exit_simulation:
+                    break
+                with self.instruments.phase('evolve'):
+                    genomes = self.evolution.evolve(genomes, fitness)
+            self.finish_generation(reporter)
+            if self.settings["checkpoint_every"] and (gen + 1) % self.settings["checkpoint_every"] == 0:
+                self.save_checkpoint(gen + 1, genomes, fitness)
+
+    def run_islands(self, genomes, first_generation, reporter, islands=None):
+        # Every island evolves on its own in a worker process for `migration_interval` generations, then the
+        # best organisms migrate between them.
+        self.parallel_evaluator = ParallelEvaluator(self.layout, self.settings, self.settings["islands"])
+        if islands is None:
+            shards = numpy.array_split(numpy.arange(len(genomes)), self.settings["islands"])
+            islands = [(genomes[shard], None, numpy.random.default_rng(seed).bit_generator.state)
+                       for shard, seed in zip(shards, self.rng.integers(2 ** 63, size=len(shards)))]
+        gen = first_generation
+        while gen < self.settings["max_generation"]:
+            generations = min(self.settings["migration_interval"], self.settings["max_generation"] - gen)
+            results = self.parallel_evaluator.evolve_islands(islands, generations)
+            for i in range(generations):
+                self.stat['generation'] = gen + i
+                self.instruments = Instruments()
+                fitness, dead, eaten_food, ticks, best_buffers, times, counts = zip(
+                    *[history[i] for buffer, last_fitness, rng_state, history in results])
+                for island_times, island_counts in zip(times, counts):
+                    self.instruments.merge(island_times, island_counts)
+                self.stat['ticks'] = max(ticks)
+                self.instruments.count('ticks', self.stat['ticks'])
+                best_island = int(numpy.argmax([island_fitness.max() for island_fitness in fitness]))
+                self.record_stat(numpy.concatenate(fitness), numpy.concatenate(dead), numpy.concatenate(eaten_food))
+                self.keep_best_genome(Genome(self.layer_shapes, best_buffers[best_island]),
+                                      fitness[best_island].max())
+                self.finish_generation(reporter)
+            gen += generations
+            islands = [(Genome(self.layer_shapes, buffer), last_fitness, rng_state)
+                       for buffer, last_fitness, rng_state, history in results]
+            migrate([(island_genomes, last_fitness) for island_genomes, last_fitness, rng_state in islands],
+                    self.settings["migration_topology"], self.settings["migration_size"])
+            checkpoint_every = self.settings["checkpoint_every"]
+            if checkpoint_every and gen // checkpoint_every > (gen - generations) // checkpoint_every:
+                # The islands are saved as they are, evaluated and waiting for their next evolve step.
+                island_genomes, fitness, rng_states = zip(*islands)
+                buffer = numpy.concatenate([genomes.buffer for genomes in island_genomes])
+                self.save_checkpoint(gen, Genome(self.layer_shapes, buffer), numpy.concatenate(fitness),
+                                     dict(sizes=[len(genomes) for genomes in island_genomes], rng_states=rng_states))
+
+    def finish_generation(self, reporter):
+        self.stat.update(self.instruments.report())
+        self.stat_history.append(copy(self.stat))
+        if reporter:
+            reporter.publish(self.stat)
+
+    def create_reporter(self):
+        if not self.settings["stats_file"] and not self.settings["draw_stats"]:
+            return None
+        stats_file = self.checkpoint_path(self.settings["stats_file"]) if self.settings["stats_file"] else None
+        plot_file = self.checkpoint_path(self.settings["stats_plot"]) if self.settings["draw_stats"] else None
+        return StatsReporter(stats_file, plot_file, self.settings["plot_every"])
 
     def load_environment(self):
         env = None
@@ -56,39 +178,89 @@ class Genetic:
             if saved_env:
                 env = saved_env
         if not env:
-            env = Environment(self.game_display, self.settings)
+            env = Environment(self.game_display, self.settings, self.world_rng)
             env.generate_environment()
             if not self.settings["always_generate_environment"]:
                 self.save_env_file(env)
         return env
 
+    def stack_layouts(self):
+        # The extra layouts are generated once and the stack is reused by every generation.
+        if self.settings["environments"] == 1:
+            return self.env.layout
+        while len(self.extra_layouts) < self.settings["environments"] - 1:
+            env = Environment(self.game_display, self.settings, self.world_rng)
+            env.generate_environment()
+            self.extra_layouts.append(env.layout)
+        return LayoutStack([self.env.layout] + self.extra_layouts)
+
     def save_env_file(self, env):
-        foods_coordinates = []
-        blocks_coordinates = []
-        for food in env.foods:
-            foods_coordinates.append(food.get_position())
-        for block in env.blocks:
-            blocks_coordinates.append(block.get_position())
-        numpy.savez(self.saves_folder + '/env.npz', foods_coordinates=foods_coordinates, blocks_coordinates=blocks_coordinates)
+        os.makedirs(self.saves_folder, exist_ok=True)
+        numpy.savez(self.saves_folder + '/env.npz', foods_coordinates=env.layout.food_positions,
+                    blocks_coordinates=env.layout.block_positions)
 
     def load_env_file(self):
         if not Path(self.saves_folder + "/env.npz").exists():
             return None
         saved_env = numpy.load(self.saves_folder + "/env.npz")
-        env = Environment(self.game_display, self.settings)
-        foods = []
-        blocks = []
-        for block_pos in saved_env['blocks_coordinates']:
-            block = Block(self.game_display, block_pos[0], block_pos[1])
-            blocks.append(block)
-        for food_pos in saved_env['foods_coordinates']:
-            food = Food(self.game_display, blocks, food_pos[0], food_pos[1])
-            foods.append(food)
-        env.foods = foods
-        env.blocks = blocks
+        return self.build_environment(saved_env['blocks_coordinates'], saved_env['foods_coordinates'])
+
+    def build_environment(self, blocks_coordinates, foods_coordinates):
+        env = Environment(self.game_display, self.settings, self.world_rng)
+        env.build_layout(blocks_coordinates, foods_coordinates)
         return env
 
+    def checkpoint_path(self, checkpoint_file):
+        return checkpoint_file if os.path.dirname(checkpoint_file) else path.join(self.saves_folder, checkpoint_file)
+
+    def save_checkpoint(self, generation, genomes, fitness, islands=None):
+        # Only copies happen here, the file is written by the checkpointer's thread while the next generation runs.
+        best_genome = self.stat['best_genome']
+        stat_history = [{key: value for key, value in stat.items() if key != 'best_genome'} for stat in self.stat_history]
+        arrays = dict(generation=generation,
+                      genomes=genomes.buffer.copy(),
+                      fitness=numpy.array(fitness, copy=True),
+                      layer_shapes=numpy.array(self.layer_shapes),
+                      best_genome=best_genome[0].buffer.copy() if best_genome else numpy.empty(0, numpy.float32),
+                      best_genome_fitness=best_genome[1] if best_genome else 0.0,
+                      rng_state=encode(self.rng.bit_generator.state),
+                      stat_history=encode(stat_history),
+                      blocks_coordinates=self.env.layout.block_positions,
+                      foods_coordinates=self.env.layout.food_positions)
+        if islands:
+            arrays['islands'] = encode(islands)
+        if self.checkpointer is None:
+            self.checkpointer = Checkpointer()
+        self.checkpointer.save(self.checkpoint_path(self.settings["checkpoint_file"]), arrays)
+
+    def load_checkpoint(self, checkpoint_file):
+        saved = read(self.checkpoint_path(checkpoint_file))
+        if [tuple(shape) for shape in saved['layer_shapes'].tolist()] != self.layer_shapes:
+            raise ValueError('Checkpoint network layers {} do not match the settings {}'.format(
+                saved['layer_shapes'].tolist(), self.layer_shapes))
+        self.env = self.build_environment(saved['blocks_coordinates'], saved['foods_coordinates'])
+        self.layout = self.stack_layouts()
+        self.rng.bit_generator.state = decode(saved['rng_state'])
+        self.stat_history = decode(saved['stat_history'])
+        self.stat['best_genome'] = None
+        if len(saved['best_genome']):
+            self.stat['best_genome'] = Genome(self.layer_shapes, saved['best_genome']), float(saved['best_genome_fitness'])
+        genomes = Genome(self.layer_shapes, saved['genomes'])
+        islands = None
+        if 'islands' in saved:
+            # Island genomes were already evaluated, they only continue as the same islands.
+            saved_islands = decode(saved['islands'])
+            if len(saved_islands['sizes']) != self.settings["islands"]:
+                raise ValueError('Checkpoint has {} islands, the settings {}'.format(len(saved_islands['sizes']),
+                                                                                     self.settings["islands"]))
+            ends = numpy.cumsum(saved_islands['sizes'])
+            islands = [(genomes[end - size:end], saved['fitness'][end - size:end], rng_state)
+                       for end, size, rng_state in zip(ends, saved_islands['sizes'], saved_islands['rng_states'])]
+        return genomes, int(saved['generation']), islands
+
     def initialize_simulation(self, display_width, display_height):
+        # pygame is only loaded for a display, headless runs and the worker processes start without it.
+        import pygame
         game_display = pygame.display.set_mode((display_width, display_height))
         pygame.display.set_caption('Genetic learning')
         clock = pygame.time.Clock()
@@ -96,183 +268,195 @@ class Genetic:
         pygame.font.init()
         return game_display, clock
 
-    def simulate(self, organisms):
-        close_session = False
+    def is_rendered(self, generation):
+        return self.game_display is not None and generation % self.settings["render_every"] == 0
+
+    def is_recorded(self, generation):
+        return self.replay is not None and self.replay.is_recorded(generation)
+
+    def simulate(self, genomes, render=True, record=False):
+        if self.fitness_cache is not None and not render and not record:
+            return self.simulate_cached(genomes)
+        fitness, dead, eaten_food, exit_simulation = self.evaluate(genomes, render, record)
+        if self.fitness_cache is not None:
+            self.fitness_cache.update(dict(zip(self.cache_keys(genomes), zip(fitness, dead, eaten_food))))
+        return fitness, exit_simulation
+
+    def simulate_cached(self, genomes):
+        # Carried over elites and identical offsprings reuse the results of the previous generation, only the new
+        # genomes are simulated, each of them once.
+        keys = self.cache_keys(genomes)
+        results = {key: result for key, result in zip(keys, self.fitness_cache.lookup(keys)) if result is not None}
+        missing = {}
+        for i, key in enumerate(keys):
+            if key not in results:
+                missing.setdefault(key, i)
         exit_simulation = False
-        while not close_session and not exit_simulation:
-            if self.generation_is_dead(organisms):
-                close_session = True
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    exit_simulation = True
-
+        if missing:
+            fitness, dead, eaten_food, exit_simulation = self.evaluate(genomes[list(missing.values())], False)
+            results.update(zip(missing, zip(fitness, dead, eaten_food)))
+        self.instruments.count('cached_genomes', len(genomes) - len(missing))
+        fitness, dead, eaten_food = (numpy.array(values) for values in zip(*[results[key] for key in keys]))
+        self.calc_stat(genomes, fitness, dead, eaten_food)
+        self.fitness_cache.update(results)
+        return fitness, exit_simulation
+
+    def cache_keys(self, genomes):
+        layout = self.layout if self.settings["engine"] == "population" else self.env.layout
+        return self.fitness_cache.keys(genomes, layout.identity)
+
+    def evaluate(self, genomes, render=True, record=False):
+        if self.settings["engine"] == "population":
+            return self.simulate_population(genomes, render, record)
+        return self.simulate_organisms(genomes, render, record)
+
+    def simulate_organisms(self, genomes, render=True, record=False):
+        from organism import Organism
+        organisms = [Organism(self.game_display, self.network.policy(genomes[i:i + 1]), self.env.layout)
+                     for i in range(len(genomes))]
+        scheduler = GenerationScheduler(self.settings)
+        best = BestTracker()
+        active = numpy.arange(len(organisms))
+        fitness = numpy.zeros(len(organisms))
+        dead = numpy.zeros(len(organisms), dtype=bool)
+        food_indices = numpy.zeros(len(organisms), dtype=int)
+        if record:
+            self.replay.start(self.stat['generation'], self.env.layout)
+        finished = False
+        exit_simulation = False
+        while not finished and not exit_simulation:
+            exit_simulation = self.handle_events()
+
+            with self.instruments.phase('learn'):
+                for i in reversed(active):
+                    organisms[i].learn()
+            self.stat['ticks'] += 1
+            self.instruments.count('ticks')
+            self.instruments.count('organism_steps', len(active))
+            self.instruments.count('nn_evaluations', len(active))
+
+            fitness[active] = [organisms[i].fitness for i in active]
+            dead[active] = [organisms[i].is_dead() for i in active]
+            food_indices[active] = [organisms[i].food_index for i in active]
+            best.update(fitness, active)
+            active = active[~dead[active]]
+            finished = scheduler.update(active, food_indices.sum(), fitness)
+            self.calc_stat(genomes, fitness, dead, food_indices, best.index)
+            if render:
+                self.draw_simulation([(org.position.x, org.position.y) for org in organisms],
+                                     [org.angle for org in organisms], food_indices, ~dead, best.index)
+                self.clock.tick(30)
+            if record:
+                with self.instruments.phase('record'):
+                    self.replay.record([(org.position.x, org.position.y) for org in organisms],
+                                       [org.angle for org in organisms], food_indices, ~dead, best.index)
+        if record:
+            self.replay.finish(fitness)
+        return fitness, dead, food_indices, exit_simulation
+
+    def simulate_population(self, genomes, render=False, record=False):
+        if self.settings["workers"] > 1 and not render and not record:
+            return self.simulate_parallel(genomes)
+        population = Population(genomes, self.network, self.layout, self.instruments)
+        # Only the organisms of the first layout are drawn and recorded.
+        shown = slice(0, len(genomes))
+        if record:
+            self.replay.start(self.stat['generation'], self.layout.layouts[0])
+        scheduler = GenerationScheduler(self.settings)
+        finished = False
+        exit_simulation = False
+        while not finished and not exit_simulation:
+            exit_simulation = self.handle_events()
+
+            population.learn()
+            self.stat['ticks'] += 1
+            self.instruments.count('ticks')
+            finished = scheduler.update(population.active, population.total_eaten_food, population.fitness)
+
+            if render:
+                best = population.best.index if population.layout_count == 1 else None
+                best = self.calc_stat(genomes, population.fitness[shown], population.is_dead()[shown],
+                               population.state[shown], best)
+                self.draw_simulation(population.position[shown], population.angle[shown], population.state[shown],
+                                     ~population.is_dead()[shown], best)
+                self.clock.tick(30)
+            if record:
+                with self.instruments.phase('record'):
+                    best = population.best.index
+                    if population.layout_count > 1:
+                        best = int(numpy.argmax(population.fitness[shown]))
+                    self.replay.record(population.position[shown], population.angle[shown], population.state[shown],
+                                       ~population.is_dead()[shown], best)
+
+        fitness, dead, eaten_food = population.genome_results(self.settings["fitness_aggregation"],
+                                                              self.settings["fitness_quantile"])
+        if record:
+            self.replay.finish(fitness)
+        self.calc_stat(genomes, fitness, dead, eaten_food)
+        return fitness, dead, eaten_food, exit_simulation
+
+    def simulate_parallel(self, genomes):
+        if not self.parallel_evaluator:
+            self.parallel_evaluator = ParallelEvaluator(self.layout, self.settings)
+        fitness, dead, eaten_food, self.stat['ticks'] = self.parallel_evaluator.evaluate(genomes, self.instruments)
+        self.instruments.count('ticks', self.stat['ticks'])
+        self.calc_stat(genomes, fitness, dead, eaten_food)
+        return fitness, dead, eaten_food, False
+
+    def handle_events(self):
+        if self.game_display is None:
+            return False
+        import pygame
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return True
+        return False
+
+    def draw_simulation(self, positions, angles, food_indices, alive, best):
+        with self.instruments.phase('render'):
+            self.render(positions, angles, food_indices, alive, best)
+
+    def render(self, positions, angles, food_indices, alive, best):
+        if self.settings["cache_background"]:
+            self.env.draw_background()
+        else:
             self.draw_background(self.game_display)
             self.env.draw_blocks()
-            for org in reversed(organisms):
-                org.learn()
-                org.environment.draw_food()
-                pygame.sprite.RenderPlain(org).draw(self.game_display)
-
-            for org in organisms:
-                org.is_best = False
-                org.environment.get_food().is_best = False
-
-            organisms = sorted(organisms, key=operator.attrgetter('fitness'), reverse=True)
-            organisms[0].is_best = True
-            organisms[0].environment.get_food().is_best = True
-
-            self.calc_stat(organisms)
-            self.draw_stat()
-            pygame.display.flip()
-            self.clock.tick(30)
-        return organisms, exit_simulation
-
-    def generation_is_dead(self, organisms):
-        for org in organisms:
-            if not org.is_dead():
-                return False
-        return True
+        self.env.draw_organisms(positions, angles, food_indices, alive, best, self.settings["render_best_only"])
+        self.draw_stat()
+        import pygame
+        pygame.display.flip()
 
     def draw_background(self, game_display):
         game_display.fill((255, 255, 255))
 
-    def calc_stat(self, organisms):
-        best_fitness = 0
-        sum_fitness = 0
-        dead_organism = 0
-        best_organism = {}
-        eaten_food = 0
-        for org in organisms:
-            sum_fitness += org.fitness
-            if org.fitness > best_fitness:
-                best_fitness = org.fitness
-                best_organism = org
-            if org.is_dead():
-                dead_organism += 1
-            if org.environment.state > eaten_food:
-                eaten_food = org.environment.state
-        self.stat['best_fitness'] = best_fitness
-        self.stat['sum_fitness'] = sum_fitness
-        self.stat['dead_organism'] = dead_organism
-        self.stat['eaten_food'] = eaten_food
-        saved_best_organism = self.stat['best_organism']
-        if 'best_organism' not in self.stat or not saved_best_organism or (bool(best_organism) and
-                                                                           saved_best_organism.fitness < best_organism.fitness):
-            self.stat['best_organism'] = best_organism
+    def calc_stat(self, genomes, fitness, dead, eaten_food, best=None):
+        best = int(numpy.argmax(fitness)) if best is None else best
+        self.record_stat(fitness, dead, eaten_food, best)
+        self.keep_best_genome(genomes[best], fitness[best])
+        return best
+
+    def record_stat(self, fitness, dead, eaten_food, best=None):
+        best = int(numpy.argmax(fitness)) if best is None else best
+        self.stat['best_fitness'] = max(float(fitness[best]), 0)
+        self.stat['sum_fitness'] = float(fitness.sum())
+        self.stat['dead_organism'] = int(dead.sum())
+        self.stat['eaten_food'] = int(eaten_food.max())
+
+    def keep_best_genome(self, genome, fitness):
+        saved_best_genome = self.stat['best_genome']
+        if fitness > 0 and (not saved_best_genome or saved_best_genome[1] < fitness):
+            self.stat['best_genome'] = genome.copy(), float(fitness)
 
     def draw_stat(self):
-        myfont = pygame.font.SysFont('Comic Sans MS', 12, bold=True)
-        texts = ['Elapsed time: {elapsed}',
-                 'Population size: {population_size}',
-                 'Best fitness: {best_fitness}',
-                 'Sum fitness: {sum_fitness}',
-                 'Dead organism: {dead_organism} / {population_size}',
-                 'Generation: {generation}',
-                 'Eaten food: {eaten_food}']
-        d = dict(elapsed="%.f" % (time.time() - self.stat['start_time']),
-                 best_fitness="%.f" % self.stat['best_fitness'],
-                 sum_fitness="%.f" % self.stat['sum_fitness'],
-                 dead_organism=self.stat['dead_organism'],
-                 population_size=self.settings["population_size"],
-                 generation=self.stat['generation'] + 1,
-                 eaten_food=self.stat['eaten_food'])
-        for i, text in enumerate(texts):
-            textsurface = myfont.render(text.format(**d), False, (0, 0, 0))
-            self.game_display.blit(textsurface, (5, i * 15))
-
-    def evolve(self, organisms):
-        offsprings = []
-
-        parents = self.select_elite(organisms)
-        numpy.random.shuffle(parents)
-        pairs = []
-        while len(pairs) != self.settings["population_size"]:
-            pairs.append(self.pair(parents))
-
-        for pair in pairs:
-            offspring_pair = self.crossover(pair[0], pair[1])
-            pick = randint(0, 1)
-            offsprings.append(offspring_pair[pick])
-
-        self.mutation(offsprings)
-
-        return offsprings
-
-    def select_elite(self, organisms):
-        elites = []
-        organisms_sorted = sorted(organisms, key=operator.attrgetter('fitness'), reverse=True)
-        for i in range(0, self.settings["elite_size"]):
-            organism = Organism(self.game_display, organisms_sorted[i].wih, organisms_sorted[i].whh,
-                                          organisms_sorted[i].who, self.env)
-            organism.environment.reset_state()
-            organism.fitness = organisms_sorted[i].fitness
-            elites.append(organism)
-        return elites
-
-    def pair(self, parents):
-        total_fitness_parents = sum([parent.fitness for parent in parents])
-        pick = numpy.random.uniform(0, total_fitness_parents)
-        pair_1 = self.r_selection(parents, pick)
-        pair_2 = self.r_selection(parents, pick)
-        while pair_1[1] == pair_2[1]:
-            pick = numpy.random.uniform(0, total_fitness_parents)
-            pair_2 = self.r_selection(parents, pick)
-        return [pair_1[0], pair_2[0]]
-
-    def r_selection(self, parents, pick):
-        current = 0
-        for i, parent in enumerate(parents):
-            current += parent.fitness
-            if current > pick:
-                return Organism(self.game_display, copy(parent.wih), copy(parent.whh),
-                                          copy(parent.who), self.env), i
-
-    def crossover(self, x, y):
-        x.wih, y.wih = self.crossover_weight(x.wih, y.wih)
-        x.whh, y.whh = self.crossover_weight(x.whh, y.whh)
-        x.who, y.who = self.crossover_weight(x.who, y.who)
-        return x, y
-
-    def crossover_weight(self, x, y):
-        weigth_x = x
-        weigth_y = y
-        for i in range(len(x)):
-            for j in range(len(x[i])):
-                if numpy.random.choice([True, False]):
-                    weigth_x[i][j] = y[i][j]
-                    weigth_y[i][j] = x[i][j]
-        return weigth_x, weigth_y
-
-    def mutation(self, base_offsprings):
-        for offspring in base_offsprings:
-            offspring.wih = self.mutate_weight(offspring.wih)
-            offspring.whh = self.mutate_weight(offspring.whh)
-            offspring.who = self.mutate_weight(offspring.who)
-        return base_offsprings
-
-    def mutate_weight(self, offspring_weights):
-        for i in range(len(offspring_weights)):
-            for j in range(len(offspring_weights[i])):
-                if numpy.random.choice([True, False], p=[self.settings["mutation_rate"], 1 - self.settings["mutation_rate"]]):
-                    offspring_weights[i][j] = numpy.random.uniform(-1, 1)
-        return offspring_weights
-
-    def plot_stat(self):
-        best_fitnesses = []
-        sum_fitnesses = []
-        dead_organisms = []
-        for stat in self.stat_history:
-            best_fitnesses.append(stat['best_fitness'])
-            sum_fitnesses.append(stat['sum_fitness'])
-            dead_organisms.append(stat['dead_organism'])
-        pyplot.subplot(3, 1, 1)
-        pyplot.plot(best_fitnesses)
-        pyplot.legend(['Best fitness'], loc='upper left')
-        pyplot.subplot(3, 1, 2)
-        pyplot.plot(sum_fitnesses)
-        pyplot.legend(['Sum fitness'], loc='upper left')
-        pyplot.subplot(3, 1, 3)
-        pyplot.plot(dead_organisms)
-        pyplot.legend(['Dead organism'], loc='upper left')
-        pyplot.show()
\ No newline at end of file
+        with self.instruments.phase('draw_stat'):
+            self.render_stat()
+
+    def render_stat(self):
+        self.hud.draw(dict(ticks=self.stat['ticks'],
+                           best_fitness="%.f" % self.stat['best_fitness'],
+                           sum_fitness="%.f" % self.stat['sum_fitness'],
+                           dead_organism=self.stat['dead_organism'],
+                           population_size=self.settings["population_size"],
+                           generation=self.stat['generation'] + 1,
+                           eaten_food=self.stat['eaten_food']))
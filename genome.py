@@ -0,0 +1,38 @@
+import numpy
+
+
+def layer_shapes(settings):
+    # A bias is one more weight in every row, multiplied by a constant input of one.
+    hidden = settings["hidden_layers"]
+    if hidden is None:
+        hidden = [settings["hidden_nodes_size"], settings["hidden_nodes_2_size"]]
+    sizes = [settings["input_nodes_size"]] + list(hidden) + [settings["out_nodes_size"]]
+    bias = int(settings["biases"])
+    return [(rows, columns + bias) for columns, rows in zip(sizes, sizes[1:])]
+
+
+class Genome:
+
+    def __init__(self, layer_shapes, buffer):
+        self.layer_shapes = [tuple(shape) for shape in layer_shapes]
+        self.buffer = buffer
+        self.layers = []
+        start = 0
+        for rows, columns in self.layer_shapes:
+            layer = buffer[..., start:start + rows * columns]
+            self.layers.append(layer.reshape(layer.shape[:-1] + (rows, columns)))
+            start += rows * columns
+
+    @classmethod
+    def random(cls, layer_shapes, population_size, rng):
+        size = sum(rows * columns for rows, columns in layer_shapes)
+        return cls(layer_shapes, rng.uniform(-1, 1, (population_size, size)).astype(numpy.float32))
+
+    def __len__(self):
+        return len(self.buffer)
+
+    def __getitem__(self, index):
+        return Genome(self.layer_shapes, self.buffer[index])
+
+    def copy(self):
+        return Genome(self.layer_shapes, self.buffer.copy())
@@ -0,0 +1,20 @@
+class Hud:
+
+    def __init__(self, game_display, texts, position=(5, 0), line_height=15):
+        self.game_display = game_display
+        self.texts = texts
+        self.position = position
+        self.line_height = line_height
+        self.font = None
+        self.lines = [(None, None)] * len(texts)
+
+    def draw(self, values):
+        if self.font is None:
+            import pygame
+            self.font = pygame.font.SysFont('Comic Sans MS', 12, bold=True)
+        x, y = self.position
+        for i, text in enumerate(self.texts):
+            line = text.format(**values)
+            if self.lines[i][0] != line:
+                self.lines[i] = line, self.font.render(line, False, (0, 0, 0))
+            self.game_display.blit(self.lines[i][1], (x, y + i * self.line_height))
@@ -0,0 +1,84 @@
+import cProfile
+import csv
+import json
+import os
+import tracemalloc
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class Instruments:
+    phases = ('simulate', 'learn', 'sense', 'think', 'update', 'render', 'draw_stat', 'record', 'evolve')
+    counters = ('ticks', 'organism_steps', 'nn_evaluations')
+
+    def __init__(self):
+        self.times = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    @contextmanager
+    def phase(self, name):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.times[name] += perf_counter() - start
+
+    def count(self, name, value=1):
+        self.counts[name] += value
+
+    def merge(self, times, counts):
+        for name, value in times.items():
+            self.times[name] += value
+        for name, value in counts.items():
+            self.counts[name] += value
+
+    def report(self):
+        phases = self.phases + tuple(sorted(set(self.times) - set(self.phases)))
+        stat = {name + '_time': self.times[name] for name in phases}
+        counters = self.counters + tuple(sorted(set(self.counts) - set(self.counters)))
+        stat.update((name, self.counts[name]) for name in counters)
+        simulate_time = self.times['simulate']
+        for name in self.counters:
+            stat[name + '_per_second'] = self.counts[name] / simulate_time if simulate_time else 0.0
+        stat['max_rss_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+        return stat
+
+
+def export_stat(file, stat):
+    row = {key: value for key, value in stat.items() if key != 'best_genome'}
+    exists = os.path.exists(file) and os.path.getsize(file) > 0
+    with open(file, 'a', newline='') as stream:
+        if file.endswith('.csv'):
+            writer = csv.DictWriter(stream, fieldnames=list(row), extrasaction='ignore')
+            if not exists:
+                writer.writeheader()
+            writer.writerow(row)
+        else:
+            stream.write(json.dumps(row) + '\n')
+
+
+@contextmanager
+def profiled(file):
+    # cProfile and tracemalloc slow the run down a lot, they are meant for a single generation.
+    profile = cProfile.Profile()
+    tracemalloc.start()
+    profile.enable()
+    try:
+        yield
+    finally:
+        profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        os.makedirs(os.path.dirname(os.path.abspath(file)), exist_ok=True)
+        profile.dump_stats(file + '.prof')
+        with open(file + '_memory.txt', 'w') as stream:
+            stream.write('Peak traced memory: {} KiB\n'.format(peak // 1024))
+            for statistic in snapshot.statistics('lineno')[:25]:
+                stream.write(str(statistic) + '\n')
@@ -0,0 +1,107 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy
+
+from evolution import Evolution
+from genome import Genome
+from instrument import Instruments
+from policy import Network
+from population import Population
+from scheduler import GenerationScheduler
+from world import LayoutStack, WorldLayout
+
+world = {}
+
+
+def attach_world(name, sizes, display_size, settings):
+    memory = shared_memory.SharedMemory(name=name)
+    data = numpy.ndarray((sum(block_count * 3 + food_count * 2 for block_count, food_count in sizes),), dtype=float,
+                         buffer=memory.buf)
+    layouts = []
+    start = 0
+    for block_count, food_count in sizes:
+        blocks, foods = data[start:start + block_count * 3], data[start + block_count * 3:][:food_count * 2]
+        layouts.append(WorldLayout(blocks[:block_count * 2], blocks[block_count * 2:], foods, display_size))
+        start += block_count * 3 + food_count * 2
+    world['memory'] = memory
+    world['layout'] = layouts[0] if len(layouts) == 1 else LayoutStack(layouts)
+    world['settings'] = settings
+    world['network'] = Network.from_settings(settings)
+
+
+def simulate_population(population, scheduler):
+    finished = False
+    while not finished:
+        population.learn()
+        finished = scheduler.update(population.active, population.total_eaten_food, population.fitness)
+    return population
+
+
+def evaluate_shard(layer_shapes, buffer):
+    genomes = Genome(layer_shapes, buffer)
+    settings = world['settings']
+    population = simulate_population(Population(genomes, world['network'], world['layout']),
+                                     GenerationScheduler(settings))
+    return (*population.genome_results(settings["fitness_aggregation"], settings["fitness_quantile"]), population.ticks,
+            dict(population.instruments.times), dict(population.instruments.counts))
+
+
+def evolve_island(layer_shapes, buffer, fitness, rng_state, generations):
+    settings = world['settings']
+    rng = numpy.random.default_rng()
+    rng.bit_generator.state = rng_state
+    evolution = Evolution(settings, layer_shapes, rng)
+    genomes = Genome(layer_shapes, buffer)
+    history = []
+    for generation in range(generations):
+        instruments = Instruments()
+        if fitness is not None:
+            with instruments.phase('evolve'):
+                genomes = evolution.evolve(genomes, fitness, len(genomes))
+        with instruments.phase('simulate'):
+            population = simulate_population(Population(genomes, world['network'], world['layout'], instruments),
+                                             GenerationScheduler(settings))
+        fitness, dead, eaten_food = population.genome_results(settings["fitness_aggregation"],
+                                                              settings["fitness_quantile"])
+        history.append((fitness, dead, eaten_food, population.ticks,
+                        genomes.buffer[numpy.argmax(fitness)].copy(),
+                        dict(instruments.times), dict(instruments.counts)))
+    return genomes.buffer, fitness, rng.bit_generator.state, history
+
+
+class ParallelEvaluator:
+
+    def __init__(self, layout, settings, workers=None):
+        self.workers = workers or settings["workers"]
+        data = numpy.concatenate([array.ravel() for world_layout in layout.layouts
+                                  for array in (world_layout.block_positions, world_layout.block_radii,
+                                                world_layout.food_positions)])
+        self.memory = shared_memory.SharedMemory(create=True, size=max(data.nbytes, 1))
+        numpy.ndarray(data.shape, dtype=float, buffer=self.memory.buf)[:] = data
+        self.executor = ProcessPoolExecutor(self.workers, initializer=attach_world,
+                                            initargs=(self.memory.name,
+                                                      [(len(world_layout.block_radii), len(world_layout.food_positions))
+                                                       for world_layout in layout.layouts],
+                                                      layout.display_size, settings))
+
+    def evaluate(self, genomes, instruments):
+        shards = [shard for shard in numpy.array_split(numpy.arange(len(genomes)), self.workers) if len(shard)]
+        futures = [self.executor.submit(evaluate_shard, genomes.layer_shapes, genomes.buffer[shard])
+                   for shard in shards]
+        results = [future.result() for future in futures]
+        fitness, dead, state, ticks, times, counts = zip(*results)
+        for shard_times, shard_counts in zip(times, counts):
+            instruments.merge(shard_times, shard_counts)
+        return numpy.concatenate(fitness), numpy.concatenate(dead), numpy.concatenate(state), max(ticks)
+
+    def evolve_islands(self, islands, generations):
+        futures = [self.executor.submit(evolve_island, genomes.layer_shapes, genomes.buffer, fitness, rng_state,
+                                        generations)
+                   for genomes, fitness, rng_state in islands]
+        return [future.result() for future in futures]
+
+    def close(self):
+        self.executor.shutdown()
+        self.memory.close()
+        self.memory.unlink()
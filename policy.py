@@ -0,0 +1,132 @@
+import math
+from functools import lru_cache
+from importlib.util import find_spec
+
+import numpy
+
+from genome import layer_shapes
+
+ACTIVATIONS = ('tanh', 'relu', 'sigmoid', 'identity')
+BACKENDS = ('numpy', 'numba')
+
+
+def activate(values, activation):
+    if activation == 'tanh':
+        numpy.tanh(values, out=values)
+    elif activation == 'relu':
+        numpy.maximum(values, 0, out=values)
+    elif activation == 'sigmoid':
+        # Same as 1 / (1 + exp(-x)) without overflow warnings for large weights.
+        values *= 0.5
+        numpy.tanh(values, out=values)
+        values *= 0.5
+        values += 0.5
+
+
+@lru_cache(maxsize=None)
+def forward_kernel():
+    # numba takes a while to import and compile, it is only loaded when the backend is used.
+    import numba
+
+    @numba.njit(parallel=True, fastmath=True, cache=True)
+    def kernel(buffer, rows, inputs, shapes, starts, codes, biases, out):
+        # The organisms are spread over the cores, their weights are read in place from the genome buffer.
+        width = max(inputs.shape[1], shapes[:, 0].max())
+        for n in numba.prange(len(rows)):
+            weights = buffer[rows[n]]
+            current = numpy.empty(width, dtype=numpy.float32)
+            following = numpy.empty(width, dtype=numpy.float32)
+            current[:inputs.shape[1]] = inputs[n]
+            for layer in range(len(shapes)):
+                columns = shapes[layer, 1] - biases
+                for i in range(shapes[layer, 0]):
+                    start = starts[layer] + i * shapes[layer, 1]
+                    total = numpy.float32(0)
+                    if biases:
+                        total += weights[start + columns]
+                    for j in range(columns):
+                        total += weights[start + j] * current[j]
+                    if codes[layer] == 0:
+                        total = math.tanh(total)
+                    elif codes[layer] == 1:
+                        total = max(total, numpy.float32(0))
+                    elif codes[layer] == 2:
+                        total = 0.5 * math.tanh(0.5 * total) + 0.5
+                    following[i] = total
+                current, following = following, current
+            out[n, :] = current[:out.shape[1]]
+
+    return kernel
+
+
+class Network:
+
+    def __init__(self, layer_shapes, activations, biases=False, backend='numpy'):
+        if backend not in BACKENDS:
+            raise ValueError('Unknown policy backend {}, use one of {}'.format(backend, ', '.join(BACKENDS)))
+        if backend == 'numba' and not find_spec('numba'):
+            raise ValueError('The numba policy backend needs the numba package')
+        for activation in activations:
+            if activation not in ACTIVATIONS:
+                raise ValueError('Unknown activation {}, use one of {}'.format(activation, ', '.join(ACTIVATIONS)))
+        self.layer_shapes = [tuple(shape) for shape in layer_shapes]
+        self.activations = list(activations)
+        self.biases = biases
+        self.backend = backend
+
+    @classmethod
+    def from_settings(cls, settings):
+        shapes = layer_shapes(settings)
+        activations = [settings["activation"]] * (len(shapes) - 1) + [settings["output_activation"]]
+        return cls(shapes, activations, settings["biases"], settings["policy_backend"])
+
+    def policy(self, genomes):
+        return Policy(self, genomes)
+
+
+class Policy:
+
+    def __init__(self, network, genomes):
+        self.network = network
+        self.genomes = genomes
+        self.size = len(genomes)
+        self.layers = genomes.layers
+        self.out_size = network.layer_shapes[-1][0]
+        # Every layer writes into its own buffer, with a trailing column of ones for the bias weights.
+        bias = int(network.biases)
+        self.scratch = [numpy.ones((self.size, columns), dtype=genomes.buffer.dtype)
+                        for rows, columns in network.layer_shapes]
+        self.scratch.append(numpy.ones((self.size, self.out_size + bias), dtype=genomes.buffer.dtype))
+        if network.backend == 'numba':
+            self.shapes = numpy.array(network.layer_shapes, dtype=numpy.int64)
+            self.starts = numpy.cumsum([0] + [rows * columns for rows, columns in network.layer_shapes[:-1]])
+            self.codes = numpy.array([ACTIVATIONS.index(activation) for activation in network.activations])
+
+    def __len__(self):
+        return self.size
+
+    def forward(self, rows, inputs):
+        # The result is a view of the scratch buffers, it is only valid until the next call.
+        count, input_size = len(rows), inputs.shape[1]
+        if self.network.backend == 'numba':
+            out = self.scratch[-1][:count, :self.out_size]
+            forward_kernel()(self.genomes.buffer, rows, numpy.asarray(inputs, dtype=self.genomes.buffer.dtype),
+                           self.shapes, self.starts, self.codes, int(self.network.biases), out)
+            return out
+        if 2 * count < self.size:
+            # Gathering the weights of the few survivors is cheaper than multiplying the whole population.
+            layers = [layer[rows] for layer in self.layers]
+            values = self.scratch[0][:count]
+            values[:, :input_size] = inputs
+        else:
+            layers = self.layers
+            values = self.scratch[0]
+            values[rows, :input_size] = inputs
+        for layer, following, activation in zip(layers, self.scratch[1:], self.network.activations):
+            following = following[:len(values)]
+            rows_out = layer.shape[-2]
+            numpy.matmul(layer, values[:, :, None], out=following[:, :rows_out, None])
+            activate(following[:, :rows_out], activation)
+            values = following
+        values = values[:, :self.out_size]
+        return values if len(values) == count else values[rows]
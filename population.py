@@ -0,0 +1,185 @@
+import math
+
+import numpy
+
+import assets
+from instrument import Instruments
+from selection import BestTracker
+from sensing import sense
+
+
+def rotate(vectors, angles):
+    # Same special cases and angle normalization as pygame.math.Vector2.rotate_ip.
+    angles = numpy.fmod(angles, 360.0)
+    angles = numpy.where(angles < 0, angles + 360.0, angles)
+    rads = numpy.radians(angles)
+    cos, sin = numpy.cos(rads), numpy.sin(rads)
+    x, y = vectors[..., 0], vectors[..., 1]
+    rotated = numpy.stack([cos * x - sin * y, sin * x + cos * y], axis=-1)
+    epsilon = 1e-6
+    right_angle = numpy.fmod(angles + epsilon, 90.0) < 2 * epsilon
+    if right_angle.any():
+        quarter = ((angles + epsilon) // 90).astype(int) % 4
+        quarter_turns = numpy.stack([numpy.stack([x, y], axis=-1), numpy.stack([-y, x], axis=-1),
+                                     numpy.stack([-x, -y], axis=-1), numpy.stack([y, -x], axis=-1)])
+        exact = numpy.take_along_axis(quarter_turns, quarter[None, ..., None], axis=0)[0]
+        rotated = numpy.where(right_angle[..., None], exact, rotated)
+    return rotated
+
+
+def aggregate(values, layout_count, method, quantile):
+    values = values.reshape(layout_count, -1)
+    if method == "min":
+        return values.min(axis=0)
+    if method == "quantile":
+        return numpy.quantile(values, quantile, axis=0)
+    return values.mean(axis=0)
+
+
+def rotated_sizes(size, angles):
+    width, height = size
+    rads = numpy.radians(angles)
+    cos_x, cos_y = numpy.cos(rads) * (width // 2), numpy.cos(rads) * (height // 2)
+    sin_x, sin_y = numpy.sin(rads) * (width // 2), numpy.sin(rads) * (height // 2)
+    half_width = numpy.maximum(numpy.ceil(numpy.maximum(abs(cos_x + sin_y), abs(cos_x - sin_y))), 1)
+    half_height = numpy.maximum(numpy.ceil(numpy.maximum(abs(sin_x + cos_y), abs(sin_x - cos_y))), 1)
+    unrotated = abs(angles) <= 0.001
+    return numpy.where(unrotated, width, 2 * half_width), numpy.where(unrotated, height, 2 * half_height)
+
+
+class Population:
+    max_speed = 4
+    max_angle_speed = 16
+    lifetime = 900
+    sight_distance = 60
+    sight_angles = (0, 45, 90, -45, -90)
+    organism_padding = 15
+    eat_distance = 25
+    eaten_food_score = 300
+    alive_time_score = 0.01
+
+    def __init__(self, genomes, network, layout, instruments=None):
+        # With several layouts every genome is evaluated once in each of them, organism i runs genome
+        # i % genome_count in layout i // genome_count.
+        self.genome_count = len(genomes)
+        self.layout_count = len(layout.offsets)
+        if self.layout_count > 1:
+            genomes = genomes[numpy.tile(numpy.arange(self.genome_count), self.layout_count)]
+        self.policy = network.policy(genomes)
+        self.size = len(genomes)
+        self.layout_index = numpy.repeat(numpy.arange(self.layout_count), self.genome_count)
+        self.offsets = layout.offsets if self.layout_count > 1 else None
+        self.display_width, self.display_height = layout.display_size
+        self.image_size = assets.image_size('organism.png')
+        self.block_grid = layout.block_grid
+        self.foods = layout.food_table
+        self.instruments = instruments or Instruments()
+
+        self.ticks = 0
+        self.position = numpy.tile([self.display_width * 0.5, self.display_height * 0.5], (self.size, 1))
+        self.direction = numpy.tile([0.0, -1.0], (self.size, 1))
+        self.angle = numpy.zeros(self.size)
+        self.angle_speed = numpy.zeros(self.size)
+        self.speed = numpy.zeros(self.size)
+        self.dead = numpy.zeros(self.size, dtype=bool)
+        self.last_eat_tick = numpy.zeros(self.size, dtype=int)
+        self.state = numpy.zeros(self.size, dtype=int)
+        self.collided = numpy.zeros(self.size, dtype=bool)
+        self.active = numpy.arange(self.size)
+        self.total_eaten_food = 0
+        self.best = BestTracker()
+
+        self.fitness = numpy.zeros(self.size)
+        self.positive_distance = numpy.zeros(self.size)
+        self.negative_distance = numpy.zeros(self.size)
+        self.eaten_food = numpy.zeros(self.size)
+        self.alive_time = numpy.zeros(self.size)
+
+        self.org_food_dist = self.calc_distance(numpy.arange(self.size))
+
+    def is_dead(self):
+        return ((self.ticks - self.last_eat_tick) > self.lifetime) | self.dead
+
+    def learn(self):
+        self.ticks += 1
+        # Only the compact active set is stepped, organisms leave it for good once they die.
+        self.dead[self.active[(self.ticks - self.last_eat_tick[self.active]) > self.lifetime]] = True
+        alive = self.active = self.active[~self.dead[self.active]]
+        if not len(alive):
+            return
+        self.alive_time[alive] += self.alive_time_score
+        eating = alive[self.org_food_dist[alive] <= self.eat_distance]
+        self.last_eat_tick[eating] = self.ticks
+        self.eaten_food[eating] += 1
+        self.state[eating] += 1
+        self.total_eaten_food += len(eating)
+        self.instruments.count('organism_steps', len(alive))
+        self.instruments.count('nn_evaluations', len(alive))
+        dis = self.calc_distance(alive)
+        heading = self.calc_heading(alive)
+        self.positive_distance[alive] += (dis < self.org_food_dist[alive]) & (-0.2 < heading) & (heading < 0.2)
+        self.negative_distance[alive] -= dis > self.org_food_dist[alive]
+        self.org_food_dist[alive] = dis
+        self.think(alive, heading, self.calc_norm_dist(alive))
+        with self.instruments.phase('update'):
+            self.update(alive)
+            self.calc_fitness(alive)
+        self.best.update(self.fitness, alive)
+
+    def think(self, alive, heading, norm_dist):
+        offset = None if self.offsets is None else self.offsets[self.layout_index[alive]]
+        with self.instruments.phase('sense'):
+            norm_sight, self.collided[alive] = sense(self.position[alive], self.direction[alive], self.block_grid,
+                                                     (self.display_width, self.display_height), self.sight_angles,
+                                                     self.sight_distance, self.organism_padding, offset)
+        with self.instruments.phase('think'):
+            self.feed_forward_alive(alive, heading, norm_dist, norm_sight)
+
+    def feed_forward_alive(self, alive, heading, norm_dist, norm_sight):
+        out = self.policy.forward(alive, numpy.column_stack([heading, norm_dist, norm_sight]))
+        self.speed[alive] = numpy.clip(self.speed[alive] + out[:, 0], 0, self.max_speed)
+        self.angle_speed[alive] = out[:, 1] * self.max_angle_speed
+
+    def update(self, alive):
+        turning = alive[self.angle_speed[alive] != 0]
+        self.direction[turning] = rotate(self.direction[turning], self.angle_speed[turning])
+        self.angle[turning] = (self.angle[turning] + self.angle_speed[turning]) % 360
+        moving = alive[~self.check_boundary(alive)]
+        self.position[moving] += self.direction[moving] * self.speed[moving, None]
+
+    def check_boundary(self, alive):
+        next_position = self.position[alive] + self.direction[alive] * self.speed[alive, None]
+        image_width, image_height = rotated_sizes(self.image_size, -self.angle[alive])
+        outside = ((self.display_width + self.organism_padding <= next_position[:, 0] + image_width / 2) |
+                   (0 - self.organism_padding >= next_position[:, 0] - image_width / 2) |
+                   (self.display_height + self.organism_padding <= next_position[:, 1] + image_height / 2) |
+                   (0 - self.organism_padding >= next_position[:, 1] - image_height / 2))
+        collided = self.collided[alive] & ~outside
+        self.dead[alive[collided]] = True
+        self.fitness[alive[collided]] -= self.eaten_food_score
+        return outside | collided
+
+    def calc_heading(self, alive):
+        food = self.foods[self.layout_index[alive], self.state[alive]]
+        d_x = food[:, 0] - self.position[alive, 0]
+        d_y = food[:, 1] - self.position[alive, 1]
+        theta_d = numpy.degrees(numpy.arctan2(d_x, -d_y)) - self.angle[alive]
+        theta_d = numpy.where(abs(theta_d) > 180, theta_d + 360, theta_d)
+        return theta_d / 180
+
+    def calc_distance(self, alive):
+        food = self.foods[self.layout_index[alive], self.state[alive]]
+        return numpy.hypot(self.position[alive, 0] - food[:, 0], self.position[alive, 1] - food[:, 1])
+
+    def genome_results(self, method, quantile):
+        # Fitness aggregated over the layouts, a genome counts as dead once it died everywhere.
+        dead = self.is_dead().reshape(self.layout_count, -1).all(axis=0)
+        eaten_food = self.state.reshape(self.layout_count, -1).max(axis=0)
+        return aggregate(self.fitness, self.layout_count, method, quantile), dead, eaten_food
+
+    def calc_norm_dist(self, alive):
+        return self.org_food_dist[alive] / math.hypot(self.display_width, self.display_height)
+
+    def calc_fitness(self, alive):
+        self.fitness[alive] = self.alive_time[alive] + self.positive_distance[alive] + self.negative_distance[alive] + (
+                self.eaten_food[alive] * self.eaten_food_score)
@@ -0,0 +1,199 @@
+import argparse
+import glob
+import os
+import shutil
+import subprocess
+
+import numpy
+
+import assets
+from checkpoint import Checkpointer, read
+from selection import top
+
+POSITION_STEPS = 65535
+
+
+def delta_encode(values):
+    # Differences between ticks wrap around in the unsigned type, a cumulative sum in the same type undoes them exactly.
+    return numpy.diff(values, axis=0, prepend=numpy.zeros_like(values[:1]))
+
+
+def delta_decode(deltas):
+    return numpy.cumsum(deltas, axis=0, dtype=deltas.dtype)
+
+
+class ReplayRecorder:
+
+    def __init__(self, folder, every=1, best_count=0):
+        self.folder = folder
+        self.every = every
+        self.best_count = best_count
+        self.writer = Checkpointer()
+        self.layout = None
+        self.scale = 1.0
+        self.generation = None
+        self.ticks = []
+
+    def is_recorded(self, generation):
+        return generation % self.every == 0
+
+    def start(self, generation, layout):
+        if self.layout is not layout:
+            self.layout = layout
+            # Positions are kept as 16 bit steps of the map, organisms never get further than their padding from it.
+            self.scale = (max(layout.display_size) + 100) / POSITION_STEPS
+            self.writer.save(os.path.join(self.folder, 'world.npz'),
+                             dict(block_positions=layout.block_positions, food_positions=layout.food_positions,
+                                  map_size=numpy.array(layout.display_size)), compressed=True)
+        self.generation = generation
+        self.ticks = []
+
+    def record(self, positions, angles, food_indices, alive, best):
+        positions = numpy.rint((numpy.asarray(positions, dtype=float) + 50) / self.scale)
+        self.ticks.append((numpy.clip(positions, 0, POSITION_STEPS).astype(numpy.uint16),
+                           (numpy.rint(numpy.asarray(angles) / assets.ROTATION_STEP) %
+                            (360 // assets.ROTATION_STEP)).astype(numpy.uint8),
+                           numpy.asarray(food_indices, dtype=numpy.uint32),
+                           numpy.asarray(alive, dtype=bool),
+                           -1 if best is None else best))
+
+    def finish(self, fitness):
+        # Only the organisms that end up among the best are kept, the ticks are written while the next generation runs.
+        if not self.ticks:
+            return
+        positions, angles, food_indices, alive, best = (numpy.stack(values) for values in zip(*self.ticks))
+        self.ticks = []
+        organisms = numpy.arange(len(fitness))
+        if self.best_count:
+            organisms = numpy.sort(top(fitness, self.best_count))
+        recorded = numpy.full(len(fitness), -1)
+        recorded[organisms] = numpy.arange(len(organisms))
+        self.writer.save(os.path.join(self.folder, 'generation_{:05d}.npz'.format(self.generation)),
+                         dict(generation=self.generation,
+                              organisms=organisms,
+                              fitness=numpy.asarray(fitness)[organisms],
+                              scale=self.scale,
+                              positions=delta_encode(positions[:, organisms]),
+                              angles=angles[:, organisms],
+                              food_indices=delta_encode(food_indices[:, organisms]),
+                              alive=numpy.packbits(alive[:, organisms], axis=1),
+                              best=numpy.where(best >= 0, recorded[best], -1)), compressed=True)
+
+    def close(self):
+        self.writer.close()
+
+
+def load_generation(file):
+    saved = read(file)
+    return dict(generation=int(saved['generation']),
+                organisms=saved['organisms'],
+                fitness=saved['fitness'],
+                positions=delta_decode(saved['positions']) * saved['scale'] - 50,
+                angles=saved['angles'].astype(float) * assets.ROTATION_STEP,
+                food_indices=delta_decode(saved['food_indices']),
+                alive=numpy.unpackbits(saved['alive'], axis=1, count=len(saved['organisms'])).astype(bool),
+                best=saved['best'])
+
+
+def generation_files(folder, generations=None):
+    files = sorted(glob.glob(os.path.join(folder, 'generation_*.npz')))
+    if generations:
+        files = [file for file in files if int(os.path.basename(file)[11:16]) in generations]
+    return files
+
+
+def open_video(file, size, fps):
+    if not shutil.which('ffmpeg'):
+        raise SystemExit('ffmpeg is needed to export a video, --frames writes PNG images instead')
+    return subprocess.Popen(['ffmpeg', '-y', '-loglevel', 'error', '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+                             '-s', '{}x{}'.format(*size), '-r', str(fps), '-i', '-',
+                             '-vf', 'pad=ceil(iw/2)*2:ceil(ih/2)*2', '-pix_fmt', 'yuv420p', file],
+                            stdin=subprocess.PIPE)
+
+
+def play(folder, generations=None, speed=1.0, fps=30, video=None, frames=None):
+    exporting = video or frames
+    if exporting:
+        os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    import pygame
+    from environment import Environment
+    from hud import Hud
+
+    world = read(os.path.join(folder, 'world.npz'))
+    map_size = tuple(int(size) for size in world['map_size'])
+    pygame.init()
+    game_display = pygame.display.set_mode(map_size)
+    pygame.display.set_caption('Replay')
+    clock = pygame.time.Clock()
+    env = Environment(game_display, dict(map_size=map_size))
+    env.build_layout(world['block_positions'], world['food_positions'])
+    hud = Hud(game_display, ['Generation: {generation}',
+                             'Tick: {tick} / {ticks}',
+                             'Alive organism: {alive} / {organisms}',
+                             'Best fitness: {best_fitness}',
+                             'Speed: {speed}x'])
+    if frames:
+        os.makedirs(frames, exist_ok=True)
+    encoder = open_video(video, map_size, fps) if video else None
+    frame = 0
+    paused = False
+    try:
+        for file in generation_files(folder, generations):
+            replay = load_generation(file)
+            ticks = len(replay['positions'])
+            tick = 0.0
+            while tick < ticks:
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        return
+                    if event.type == pygame.KEYDOWN:
+                        if event.key == pygame.K_SPACE:
+                            paused = not paused
+                        elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                            speed *= 2
+                        elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                            speed /= 2
+                        elif event.key == pygame.K_RIGHT:
+                            tick = ticks
+                if tick >= ticks:
+                    break
+                i = int(tick)
+                best = int(replay['best'][i])
+                env.draw_background()
+                env.draw_organisms(replay['positions'][i], replay['angles'][i], replay['food_indices'][i],
+                                   replay['alive'][i], best if best >= 0 else None)
+                hud.draw(dict(generation=replay['generation'] + 1, tick=i + 1, ticks=ticks,
+                              alive=int(replay['alive'][i].sum()), organisms=len(replay['organisms']),
+                              best_fitness="%.f" % replay['fitness'].max(), speed="%g" % speed))
+                if exporting:
+                    if frames:
+                        pygame.image.save(game_display, os.path.join(frames, 'frame_{:06d}.png'.format(frame)))
+                    if encoder:
+                        encoder.stdin.write(pygame.image.tobytes(game_display, 'RGB'))
+                    frame += 1
+                else:
+                    pygame.display.flip()
+                    clock.tick(fps)
+                if not paused:
+                    tick += speed
+    finally:
+        if encoder:
+            encoder.stdin.close()
+            encoder.wait()
+        pygame.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Play back or export the generations recorded with replay_dir.')
+    parser.add_argument('folder', help='the replay_dir of the run')
+    parser.add_argument('--generation', type=int, nargs='*', help='only these generations, counted from 0')
+    parser.add_argument('--speed', type=float, default=1.0, help='ticks per frame, + and - change it while playing')
+    parser.add_argument('--fps', type=int, default=30)
+    parser.add_argument('--video', help='export to this video file with ffmpeg instead of playing')
+    parser.add_argument('--frames', help='export every frame as a PNG image into this folder instead of playing')
+    args = parser.parse_args()
+    play(args.folder, args.generation, args.speed, args.fps, args.video, args.frames)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+import multiprocessing
+import os
+
+from instrument import export_stat
+
+PLOTS = [('best_fitness', 'Best fitness'), ('sum_fitness', 'Sum fitness'), ('dead_organism', 'Dead organism')]
+
+
+def draw_plot(figure, lines, history, plot_file):
+    if figure is None:
+        from matplotlib.figure import Figure
+        figure = Figure(figsize=(6.4, 7.2))
+        lines = {}
+        for i, (key, label) in enumerate(PLOTS):
+            axes = figure.add_subplot(len(PLOTS), 1, i + 1)
+            lines[key], = axes.plot([], [])
+            axes.legend([label], loc='upper left')
+    # Only the data of the existing lines changes, the figure is built once.
+    for key, line in lines.items():
+        line.set_data(range(len(history[key])), history[key])
+        line.axes.relim()
+        line.axes.autoscale_view()
+    os.makedirs(os.path.dirname(os.path.abspath(plot_file)), exist_ok=True)
+    root, extension = os.path.splitext(plot_file)
+    temporary = root + '.tmp' + extension
+    figure.savefig(temporary)
+    os.replace(temporary, plot_file)
+    return figure, lines
+
+
+def write_stats(queue, stats_file, plot_file, plot_every):
+    if hasattr(os, 'nice'):
+        # Writing and plotting can wait, the training process keeps priority on a busy machine.
+        os.nice(10)
+    figure, lines = None, None
+    history = {key: [] for key, label in PLOTS}
+    received = 0
+    while True:
+        stat = queue.get()
+        if stat is None:
+            break
+        received += 1
+        if stats_file:
+            export_stat(stats_file, stat)
+        if plot_file:
+            for key, values in history.items():
+                values.append(stat[key])
+            if received % plot_every == 0:
+                figure, lines = draw_plot(figure, lines, history, plot_file)
+    if plot_file and received % plot_every:
+        draw_plot(figure, lines, history, plot_file)
+
+
+class StatsReporter:
+
+    def __init__(self, stats_file, plot_file, plot_every):
+        # Files and plots are written by a separate process, the training loop only puts a small dict in a queue.
+        self.queue = multiprocessing.Queue()
+        self.process = multiprocessing.Process(target=write_stats, args=(self.queue, stats_file, plot_file, plot_every),
+                                               daemon=True)
+        self.process.start()
+
+    def publish(self, stat):
+        self.queue.put({key: value for key, value in stat.items() if key != 'best_genome'})
+
+    def close(self):
+        self.queue.put(None)
+        self.process.join()
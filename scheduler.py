@@ -0,0 +1,31 @@
+from selection import top
+
+
+class GenerationScheduler:
+
+    def __init__(self, settings):
+        self.max_ticks = settings["max_ticks"]
+        self.stagnation_ticks = settings["stagnation_ticks"]
+        self.stable_top_k = settings["stable_top_k"]
+        self.stable_ticks = settings["stable_ticks"]
+        self.ticks = 0
+        self.eaten_food = 0
+        self.last_eat_tick = 0
+        self.top = None
+        self.top_since = 0
+
+    def update(self, active, eaten_food, fitness):
+        self.ticks += 1
+        if eaten_food > self.eaten_food:
+            self.eaten_food, self.last_eat_tick = eaten_food, self.ticks
+        if self.stable_top_k:
+            ranking = tuple(top(fitness, self.stable_top_k).tolist())
+            if ranking != self.top:
+                self.top, self.top_since = ranking, self.ticks
+        return self.is_finished(active)
+
+    def is_finished(self, active):
+        return bool(not len(active) or
+                    (self.max_ticks and self.ticks >= self.max_ticks) or
+                    (self.stagnation_ticks and self.ticks - self.last_eat_tick >= self.stagnation_ticks) or
+                    (self.stable_top_k and self.ticks - self.top_since >= self.stable_ticks))
@@ -0,0 +1,87 @@
+import numpy
+
+PAIR_RETRIES = 10
+
+
+def top(fitness, count):
+    if count >= len(fitness):
+        return numpy.argsort(-fitness, kind='stable')
+    best = numpy.argpartition(-fitness, count - 1)[:count]
+    return best[numpy.argsort(-fitness[best], kind='stable')]
+
+
+def weights(fitness):
+    # Block collisions can leave fitness negative, shift it so the worst parent has no chance instead.
+    shifted = fitness - fitness.min() if fitness.min() < 0 else fitness
+    if numpy.count_nonzero(shifted) < 2:
+        return numpy.ones(len(fitness))
+    return shifted
+
+
+def search(cumulative, picks):
+    return numpy.minimum(numpy.searchsorted(cumulative, picks, side='right'), len(cumulative) - 1)
+
+
+def roulette(fitness, count, rng):
+    cumulative = numpy.cumsum(weights(fitness))
+    return search(cumulative, rng.uniform(0, cumulative[-1], count))
+
+
+def stochastic_universal(fitness, count, rng):
+    cumulative = numpy.cumsum(weights(fitness))
+    step = cumulative[-1] / count
+    return rng.permutation(search(cumulative, rng.uniform(0, step) + step * numpy.arange(count)))
+
+
+def rank(fitness, count, rng):
+    ranks = numpy.empty(len(fitness))
+    ranks[numpy.argsort(fitness, kind='stable')] = numpy.arange(1, len(fitness) + 1)
+    return roulette(ranks, count, rng)
+
+
+def tournament(fitness, count, rng, size):
+    contestants = rng.integers(len(fitness), size=(count, size))
+    return contestants[numpy.arange(count), numpy.argmax(fitness[contestants], axis=1)]
+
+
+def select(strategy, fitness, count, rng, tournament_size):
+    if strategy == "tournament":
+        return tournament(fitness, count, rng, tournament_size)
+    if strategy == "rank":
+        return rank(fitness, count, rng)
+    if strategy == "sus":
+        return stochastic_universal(fitness, count, rng)
+    return roulette(fitness, count, rng)
+
+
+def pairs(strategy, fitness, count, rng, tournament_size=3):
+    first = select(strategy, fitness, count, rng, tournament_size)
+    second = select(strategy, fitness, count, rng, tournament_size)
+    same = numpy.flatnonzero(first == second) if len(fitness) > 1 else []
+    for retry in range(PAIR_RETRIES):
+        if not len(same):
+            break
+        second[same] = select(strategy, fitness, len(same), rng, tournament_size)
+        same = same[first[same] == second[same]]
+    # A dominant parent can keep winning every redraw, the rest get a uniformly picked different partner.
+    second[same] = (first[same] + rng.integers(1, len(fitness), len(same))) % len(fitness)
+    return numpy.column_stack([first, second])
+
+
+class BestTracker:
+
+    def __init__(self):
+        self.index = None
+        self.fitness = None
+
+    def update(self, fitness, changed):
+        # Only the changed entries can overtake the current best, a full scan is needed only when it dropped.
+        if self.index is None or fitness[self.index] < self.fitness:
+            self.index = int(numpy.argmax(fitness))
+        elif len(changed):
+            candidate = int(changed[numpy.argmax(fitness[changed])])
+            if fitness[candidate] > fitness[self.index] or (
+                    fitness[candidate] == fitness[self.index] and candidate < self.index):
+                self.index = candidate
+        self.fitness = fitness[self.index]
+        return self.index
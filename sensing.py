@@ -0,0 +1,60 @@
+import math
+
+import numpy
+
+
+def rotation(angle):
+    # cos and sin of a pygame.math.Vector2.rotate_ip turn, right angles are exact.
+    angle = math.fmod(angle, 360.0)
+    if angle < 0:
+        angle += 360.0
+    if math.fmod(angle + 1e-6, 90.0) < 2e-6:
+        return ((1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0))[int((angle + 1e-6) / 90) % 4]
+    rads = math.radians(angle)
+    return math.cos(rads), math.sin(rads)
+
+
+def sight_points(position, direction, sight_angles, sight_distance):
+    cos, sin = numpy.array([rotation(angle) for angle in sight_angles]).T
+    x, y = direction[:, 0, None], direction[:, 1, None]
+    sight_direction = numpy.stack([cos * x - sin * y, sin * x + cos * y], axis=-1)
+    return position[:, None, :] + sight_direction * sight_distance
+
+
+def sense(position, direction, block_grid, display_size, sight_angles, sight_distance, padding, offset=None):
+    display_width, display_height = display_size
+    points = sight_points(position, direction, sight_angles, sight_distance)
+    x, y = points[..., 0].ravel(), points[..., 1].ravel()
+    blocks, block_radii = block_grid.positions, block_grid.radii
+    # Blocks live in the grid's coordinates, the offset moves each organism into its own layout's region.
+    block_x, block_y, block_position = x, y, position
+    if offset is not None:
+        point_offset = numpy.repeat(offset, points.shape[1], axis=0)
+        block_x, block_y = x + point_offset[:, 0], y + point_offset[:, 1]
+        block_position = position + offset
+
+    norm_sight = numpy.zeros(len(x))
+    point_index, block_index = block_grid.candidates(numpy.column_stack([block_x, block_y]), block_grid.max_radius)
+    d_x, d_y = block_x[point_index] - blocks[block_index, 0], block_y[point_index] - blocks[block_index, 1]
+    inside = d_x ** 2 + d_y ** 2 <= block_radii[block_index] ** 2
+    first_block = numpy.full(len(x), len(blocks))
+    numpy.minimum.at(first_block, point_index[inside], block_index[inside])
+    seen = numpy.flatnonzero(first_block < len(blocks))
+    first_block = first_block[seen]
+    point_dist = numpy.hypot(block_x[seen] - blocks[first_block, 0], block_y[seen] - blocks[first_block, 1])
+    norm_sight[seen] = (sight_distance - (block_radii[first_block] - point_dist)) / sight_distance
+
+    norm_sight = numpy.select(
+        [display_width <= x, 0 >= x, display_height <= y, 0 >= y],
+        [(sight_distance - (x - display_width)) / sight_distance,
+         (sight_distance - abs(x)) / sight_distance,
+         (sight_distance - (y - display_height)) / sight_distance,
+         (sight_distance - abs(y)) / sight_distance],
+        norm_sight)
+
+    point_index, block_index = block_grid.candidates(block_position, block_grid.max_radius + padding)
+    collided = numpy.zeros(len(position), dtype=bool)
+    collided[point_index[((block_position[point_index, 0] - blocks[block_index, 0]) ** 2 +
+                          (block_position[point_index, 1] - blocks[block_index, 1]) ** 2) <
+                         (block_radii[block_index] + padding) ** 2]] = True
+    return norm_sight.reshape(points.shape[:2]), collided
@@ -0,0 +1,50 @@
+import math
+
+import numpy
+
+
+class Grid:
+
+    def __init__(self, positions, radii, cell_size):
+        self.positions = numpy.asarray(positions, dtype=float).reshape(-1, 2)
+        self.radii = numpy.asarray(radii, dtype=float).reshape(-1)
+        self.max_radius = self.radii.max() if len(self.radii) else 0.0
+        self.cell_size = float(cell_size)
+        cells = numpy.floor(self.positions / self.cell_size).astype(int)
+        self.origin = tuple(cells.min(axis=0).tolist()) if len(cells) else (0, 0)
+        self.shape = tuple((cells.max(axis=0) - self.origin + 1).tolist()) if len(cells) else (1, 1)
+        cell_ids = (cells[:, 0] - self.origin[0]) * self.shape[1] + (cells[:, 1] - self.origin[1])
+        self.order = numpy.argsort(cell_ids, kind='stable')
+        self.cell_start = numpy.searchsorted(cell_ids[self.order], numpy.arange(self.shape[0] * self.shape[1] + 1))
+        self.order_list, self.cell_start_list = self.order.tolist(), self.cell_start.tolist()
+
+    def __len__(self):
+        return len(self.positions)
+
+    def candidates(self, points, reach):
+        # Every (point, item) pair whose cells are close enough for the item center to be within reach.
+        points = numpy.asarray(points, dtype=float).reshape(-1, 2)
+        rings = numpy.arange(-math.ceil(reach / self.cell_size), math.ceil(reach / self.cell_size) + 1)
+        cells = numpy.floor(points / self.cell_size).astype(int) - self.origin
+        columns, rows = cells[:, 0, None] + rings, cells[:, 1, None] + rings
+        valid = (((columns >= 0) & (columns < self.shape[0]))[:, :, None] &
+                 ((rows >= 0) & (rows < self.shape[1]))[:, None, :]).reshape(len(points), -1)
+        cell_ids = numpy.where(valid, (columns[:, :, None] * self.shape[1] + rows[:, None, :]).reshape(len(points), -1), 0)
+        starts = self.cell_start[cell_ids]
+        counts = numpy.where(valid, self.cell_start[cell_ids + 1] - starts, 0)
+        point_index = numpy.repeat(numpy.arange(len(points)), counts.sum(axis=1))
+        counts = counts.ravel()
+        offsets = numpy.arange(len(point_index)) - numpy.repeat(numpy.cumsum(counts) - counts, counts)
+        return point_index, self.order[numpy.repeat(starts.ravel(), counts) + offsets]
+
+    def nearby(self, x, y, reach):
+        rings = math.ceil(reach / self.cell_size)
+        column = math.floor(x / self.cell_size) - self.origin[0]
+        row = math.floor(y / self.cell_size) - self.origin[1]
+        first_row, last_row = max(row - rings, 0), min(row + rings + 1, self.shape[1])
+        items = []
+        if first_row < last_row:
+            for column in range(max(column - rings, 0), min(column + rings + 1, self.shape[0])):
+                items.extend(self.order_list[self.cell_start_list[column * self.shape[1] + first_row]:
+                                             self.cell_start_list[column * self.shape[1] + last_row]])
+        return sorted(items)
@@ -0,0 +1,181 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import queue
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import Manager
+
+import numpy
+
+from ai import load_settings
+from genetic import Genetic
+from instrument import export_stat
+
+
+def grid_configs(space):
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def sample_value(rng, spec):
+    if isinstance(spec, list):
+        return spec[rng.integers(len(spec))]
+    (kind, (low, high)), = spec.items()
+    if kind == "uniform":
+        return float(rng.uniform(low, high))
+    if kind == "log_uniform":
+        return float(math.exp(rng.uniform(math.log(low), math.log(high))))
+    if kind == "integer":
+        return int(rng.integers(low, high + 1))
+    raise ValueError('Unknown distribution {}, use a list of values, uniform, log_uniform or integer'.format(kind))
+
+
+def random_configs(space, count, rng):
+    return [{name: sample_value(rng, spec) for name, spec in space.items()} for i in range(count)]
+
+
+def rung_generations(max_generation, min_generations, eta):
+    # Every rung runs eta times longer than the previous one, the last one runs the full max_generation.
+    rungs = []
+    generations = min_generations
+    while generations < max_generation:
+        rungs.append(generations)
+        generations *= eta
+    return rungs + [max_generation]
+
+
+class TaggedReporter:
+
+    def __init__(self, stats, tags):
+        self.stats = stats
+        self.tags = tags
+
+    def publish(self, stat):
+        self.stats.put(dict(self.tags, **{key: value for key, value in stat.items() if key != 'best_genome'}))
+
+    def close(self):
+        pass
+
+
+def run_trial(settings, checkpoint_file=None, reporter=None):
+    history = Genetic(settings).run(checkpoint_file, reporter)
+    return [{key: value for key, value in stat.items() if key != 'best_genome'} for stat in history]
+
+
+class Sweep:
+
+    def __init__(self, base, configs, folder, seed=None, workers=None, metric="best_fitness", eta=0,
+                 min_generations=1):
+        self.folder = folder
+        self.metric = metric
+        self.eta = eta
+        self.min_generations = min_generations
+        self.results_file = os.path.join(folder, 'results.jsonl')
+        seeds = numpy.random.SeedSequence(seed).spawn(len(configs))
+        # Every run gets its own seed and folder, the settings are checked before any process starts.
+        self.trials = []
+        for i, (config, run_seed) in enumerate(zip(configs, seeds)):
+            forced = dict(headless=True, draw_stats=False, stats_file=None, replay_dir=None,
+                          seed=int(run_seed.generate_state(1)[0]),
+                          output_dir=os.path.join(folder, 'run_{:03d}'.format(i)))
+            settings = {**base, **config}
+            conflicts = sorted(name for name in forced if name in settings and settings[name] != forced[name])
+            if conflicts:
+                raise ValueError('The sweep sets {} for every run, they cannot be swept or changed in "base"'.format(
+                    ', '.join(conflicts)))
+            settings.update(forced)
+            settings = load_settings(**settings)
+            self.trials.append(dict(run=i, config=config, settings=settings, history=[], stopped=False))
+        self.executor = ProcessPoolExecutor(workers)
+        # Every generation of every run goes through this queue into the results file, as soon as it is done.
+        self.manager = Manager()
+        self.stats = self.manager.Queue()
+
+    def run(self):
+        os.makedirs(self.folder, exist_ok=True)
+        trials = self.trials
+        max_generation = max(trial['settings']["max_generation"] for trial in trials)
+        rungs = rung_generations(max_generation, self.min_generations, self.eta) if self.eta else [max_generation]
+        for rung, generations in enumerate(rungs):
+            self.run_rung(trials, rung, generations, rung < len(rungs) - 1)
+            if rung < len(rungs) - 1:
+                # Successive halving, only the best 1/eta of the configurations get the next, longer budget.
+                trials = sorted(trials, key=self.score, reverse=True)
+                for trial in trials[max(1, len(trials) // self.eta):]:
+                    trial['stopped'] = True
+                trials = [trial for trial in trials if not trial['stopped']]
+        self.executor.shutdown()
+        self.manager.shutdown()
+        return sorted(self.trials, key=self.score, reverse=True)
+
+    def run_rung(self, trials, rung, generations, resumed_later):
+        futures = {}
+        for trial in trials:
+            settings = dict(trial['settings'], max_generation=min(generations, trial['settings']["max_generation"]))
+            if resumed_later:
+                settings.update(checkpoint_every=settings["max_generation"], checkpoint_file='sweep.npz')
+            checkpoint_file = 'sweep.npz' if trial['history'] else None
+            reporter = TaggedReporter(self.stats, dict(run=trial['run'], rung=rung, **trial['config']))
+            futures[self.executor.submit(run_trial, settings, checkpoint_file, reporter)] = trial
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=1, return_when=FIRST_COMPLETED)
+            self.write_stats()
+            for future in done:
+                futures[future]['history'] = future.result()
+        self.write_stats()
+
+    def write_stats(self):
+        while True:
+            try:
+                stat = self.stats.get_nowait()
+            except queue.Empty:
+                return
+            export_stat(self.results_file, stat)
+
+    def score(self, trial):
+        return max((stat[self.metric] for stat in trial['history']), default=-math.inf)
+
+
+def load_space(file):
+    with open(file) as stream:
+        return json.load(stream)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run headless trainings over a grid or a random search space of '
+                                                 'settings in parallel.')
+    parser.add_argument('space', help='JSON file with "base" settings and a "grid" or a "random" search space')
+    parser.add_argument('--samples', type=int, default=10, help='number of configurations drawn from "random"')
+    parser.add_argument('--seed', type=int, help='seed of the sampling and of the per-run seeds')
+    parser.add_argument('--workers', type=int, help='number of runs at the same time, all cores by default')
+    parser.add_argument('--output-dir', default=os.path.join(os.path.dirname(__file__), 'saves', 'sweep'))
+    parser.add_argument('--metric', default="best_fitness", help='statistic whose best value ranks the runs')
+    parser.add_argument('--halving', type=int, default=0, metavar='ETA',
+                        help='stop all but the best 1/ETA of the runs after every rung, 0 runs everything to the end')
+    parser.add_argument('--min-generations', type=int, default=1, help='generations of the first halving rung')
+    args = parser.parse_args()
+    if args.halving == 1 or args.halving < 0 or args.min_generations < 1:
+        parser.error('--halving has to be 0 or at least 2 and --min-generations at least 1')
+
+    space = load_space(args.space)
+    if "grid" in space:
+        configs = grid_configs(space["grid"])
+    else:
+        configs = random_configs(space["random"], args.samples, numpy.random.default_rng(args.seed))
+    try:
+        sweep = Sweep(space.get("base", {}), configs, args.output_dir, args.seed, args.workers, args.metric,
+                      args.halving, args.min_generations)
+    except ValueError as error:
+        raise SystemExit('Invalid settings: {}'.format(error))
+    ranking = sweep.run()
+    for trial in ranking:
+        print('run {:>3} {:>12.1f} {:>4} generations{} {}'.format(
+            trial['run'], sweep.score(trial), len(trial['history']), ' (stopped)' if trial['stopped'] else '',
+            json.dumps(trial['config'])))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from ai import default_settings  # noqa: E402
+
+
+@pytest.fixture
+def settings(tmp_path):
+    # Small, seeded, headless runs that write only into the test's temporary folder.
+    values = default_settings()
+    values.update(population_size=12, max_generation=2, max_ticks=40, headless=True, seed=0,
+                  output_dir=str(tmp_path))
+    return values
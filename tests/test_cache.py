@@ -0,0 +1,58 @@
+import numpy
+import pytest
+
+from cache import FitnessCache
+from genetic import Genetic
+from genome import Genome
+from policy import Network
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'numba'])
+@pytest.mark.parametrize('hidden_layers', [[20, 50], [128, 256]])
+def test_policy_output_does_not_depend_on_the_batch(settings, backend, hidden_layers):
+    # A cached fitness is only valid when a genome gets the same outputs alone, in a slice and in the whole batch.
+    if backend == 'numba':
+        pytest.importorskip('numba')
+    settings.update(hidden_layers=hidden_layers, biases=True, policy_backend=backend)
+    network = Network.from_settings(settings)
+    rng = numpy.random.default_rng(0)
+    genome = Genome.random(network.layer_shapes, 1, rng)
+    inputs = rng.uniform(-1, 1, (1, settings["input_nodes_size"])).astype(numpy.float32)
+    outputs = []
+    for size in (1, 2, 5, 64, 300):
+        genomes = Genome.random(network.layer_shapes, size, rng)
+        genomes.buffer[size // 2] = genome.buffer[0]
+        policy = network.policy(genomes)
+        batch_inputs = rng.uniform(-1, 1, (size, settings["input_nodes_size"])).astype(numpy.float32)
+        batch_inputs[size // 2] = inputs[0]
+        outputs.append(policy.forward(numpy.arange(size), batch_inputs)[size // 2].copy())
+        outputs.append(policy.forward(numpy.array([size // 2]), inputs)[0].copy())
+    for output in outputs:
+        assert numpy.array_equal(output, outputs[0])
+
+
+def test_cache_keys_follow_the_genome_and_the_layout(settings):
+    genetic = Genetic(settings)
+    genomes = Genome.random(genetic.layer_shapes, 3, genetic.rng)
+    genomes.buffer[2] = genomes.buffer[0]
+    cache = FitnessCache()
+    keys = cache.keys(genomes, genetic.layout.identity)
+    assert keys[0] == keys[2] and keys[0] != keys[1]
+    assert cache.keys(genomes, 'other layout')[0] != keys[0]
+
+
+@pytest.mark.parametrize('changes', [dict(), dict(environments=2), dict(engine='organism'), dict(workers=2)])
+def test_cached_fitness_matches_a_fresh_simulation(settings, changes):
+    settings.update(max_generation=4, elitism=4, mutation_rate=0.001, **changes)
+    fresh = Genetic(settings).run()
+    cached = Genetic(dict(settings, fitness_cache=True)).run()
+    statistics = ('best_fitness', 'sum_fitness', 'dead_organism', 'eaten_food')
+    assert [[stat[name] for name in statistics] for stat in cached] == \
+           [[stat[name] for name in statistics] for stat in fresh]
+    assert sum(stat['cached_genomes'] for stat in cached) >= 4 * (settings["max_generation"] - 1)
+    assert sum(stat['nn_evaluations'] for stat in cached) < sum(stat['nn_evaluations'] for stat in fresh)
+
+
+def test_fitness_cache_refuses_population_dependent_stops(settings):
+    with pytest.raises(ValueError):
+        Genetic(dict(settings, fitness_cache=True, stagnation_ticks=50))
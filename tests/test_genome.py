@@ -0,0 +1,41 @@
+import numpy
+
+from genome import Genome, layer_shapes
+
+
+def test_layer_shapes_follow_the_settings(settings):
+    assert layer_shapes(settings) == [(20, 7), (50, 20), (2, 50)]
+    settings.update(hidden_layers=[64, 32, 16], biases=True)
+    assert layer_shapes(settings) == [(64, 8), (32, 65), (16, 33), (2, 17)]
+
+
+def test_layers_are_views_of_the_buffer(settings):
+    shapes = layer_shapes(settings)
+    genomes = Genome.random(shapes, 5, numpy.random.default_rng(0))
+    assert genomes.buffer.dtype == numpy.float32
+    assert [layer.shape for layer in genomes.layers] == [(5,) + shape for shape in shapes]
+    for layer in genomes.layers:
+        assert numpy.shares_memory(layer, genomes.buffer)
+    genomes.layers[1][3, 4, 5] = 7.0
+    assert genomes.buffer[3, shapes[0][0] * shapes[0][1] + 4 * shapes[1][1] + 5] == 7.0
+
+
+def test_layers_round_trip_through_the_buffer(settings):
+    shapes = layer_shapes(dict(settings, biases=True))
+    genomes = Genome.random(shapes, 4, numpy.random.default_rng(0))
+    flattened = numpy.concatenate([layer.reshape(len(genomes), -1) for layer in genomes.layers], axis=1)
+    assert numpy.array_equal(flattened, genomes.buffer)
+    rebuilt = Genome(shapes, flattened)
+    for layer, rebuilt_layer in zip(genomes.layers, rebuilt.layers):
+        assert numpy.array_equal(layer, rebuilt_layer)
+
+
+def test_a_single_genome_keeps_its_layers(settings):
+    shapes = layer_shapes(settings)
+    genomes = Genome.random(shapes, 4, numpy.random.default_rng(0))
+    single = genomes[2]
+    assert [layer.shape for layer in single.layers] == shapes
+    assert numpy.array_equal(single.layers[0], genomes.layers[0][2])
+    copied = genomes.copy()
+    copied.buffer[:] = 0
+    assert genomes.buffer.any()
@@ -0,0 +1,15 @@
+from genetic import Genetic
+
+
+def trajectory(history):
+    return [(stat['generation'], stat['best_fitness'], stat['sum_fitness']) for stat in history]
+
+
+def test_resumed_island_run_follows_the_uninterrupted_one(settings):
+    settings.update(islands=2, migration_interval=2, checkpoint_every=2, max_generation=6)
+    uninterrupted = Genetic(dict(settings, checkpoint_file='full.npz')).run()
+
+    Genetic(dict(settings, max_generation=2)).run()
+    resumed = Genetic(settings).run('checkpoint.npz')
+
+    assert trajectory(resumed) == trajectory(uninterrupted)
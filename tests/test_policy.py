@@ -0,0 +1,52 @@
+import numpy
+import pytest
+
+from genome import Genome, layer_shapes
+from policy import Network
+
+FUNCTIONS = {'tanh': numpy.tanh,
+             'relu': lambda values: numpy.maximum(values, 0),
+             'sigmoid': lambda values: 1 / (1 + numpy.exp(-values)),
+             'identity': lambda values: values}
+
+
+def reference(genome, inputs, activations, biases):
+    values = inputs.astype(numpy.float64)
+    for layer, activation in zip(genome.layers, activations):
+        layer = layer.astype(numpy.float64)
+        values = layer[:, :-1] @ values + layer[:, -1] if biases else layer @ values
+        values = FUNCTIONS[activation](values)
+    return values
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'numba'])
+@pytest.mark.parametrize('biases', [False, True])
+@pytest.mark.parametrize('activations', [('tanh', 'tanh', 'tanh'), ('relu', 'sigmoid', 'identity')])
+def test_forward_matches_a_float64_reference(settings, backend, biases, activations):
+    if backend == 'numba':
+        pytest.importorskip('numba')
+    network = Network(layer_shapes(dict(settings, biases=biases)), activations, biases, backend)
+    rng = numpy.random.default_rng(0)
+    genomes = Genome.random(network.layer_shapes, 50, rng)
+    inputs = rng.uniform(-1, 1, (50, settings["input_nodes_size"]))
+    policy = network.policy(genomes)
+    # All organisms take the batched path, a few of them the gathered one.
+    for rows in (numpy.arange(50), numpy.array([3, 7, 9])):
+        outputs = policy.forward(rows, inputs[rows]).copy()
+        expected = numpy.array([reference(genomes[row], inputs[row], activations, biases) for row in rows])
+        assert outputs.dtype == numpy.float32
+        assert numpy.allclose(outputs, expected, rtol=0, atol=1e-5)
+
+
+def test_network_rejects_unknown_choices(settings):
+    shapes = layer_shapes(settings)
+    with pytest.raises(ValueError):
+        Network(shapes, ['tanh', 'softplus', 'tanh'])
+    with pytest.raises(ValueError):
+        Network(shapes, ['tanh'] * 3, backend='gpu')
+
+
+def test_from_settings_uses_the_output_activation(settings):
+    network = Network.from_settings(dict(settings, hidden_layers=[8, 8, 8], activation='relu',
+                                         output_activation='sigmoid'))
+    assert network.activations == ['relu', 'relu', 'relu', 'sigmoid']
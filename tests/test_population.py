@@ -0,0 +1,33 @@
+import numpy
+import pytest
+
+from genetic import Genetic
+from genome import Genome
+
+
+def generation_results(settings):
+    genetic = Genetic(settings)
+    genomes = Genome.random(genetic.layer_shapes, settings["population_size"], numpy.random.default_rng(1))
+    genetic.stat.update(best_genome=None, ticks=0, generation=0)
+    fitness, dead, eaten_food, exit_simulation = genetic.evaluate(genomes, False)
+    if genetic.parallel_evaluator:
+        genetic.parallel_evaluator.close()
+    return fitness, dead, eaten_food, genetic.stat['ticks']
+
+
+@pytest.mark.parametrize('changes', [dict(), dict(biases=True, hidden_layers=[16], activation='relu'),
+                                     dict(block_numbers=30, food_numbers=300)])
+def test_population_engine_matches_the_organism_reference(settings, changes):
+    settings.update(population_size=40, max_ticks=200, **changes)
+    reference = generation_results(dict(settings, engine="organism"))
+    batched = generation_results(dict(settings, engine="population"))
+    for expected, actual in zip(reference, batched):
+        assert numpy.array_equal(expected, actual)
+
+
+def test_workers_match_a_single_process(settings):
+    settings.update(population_size=30, max_ticks=150)
+    single = generation_results(settings)
+    shared = generation_results(dict(settings, workers=3))
+    for expected, actual in zip(single[:3], shared[:3]):
+        assert numpy.array_equal(expected, actual)
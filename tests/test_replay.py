@@ -0,0 +1,59 @@
+import os
+
+import numpy
+import pytest
+
+import assets
+from replay import ReplayRecorder, delta_decode, delta_encode, generation_files, load_generation
+from world import WorldLayout
+
+
+@pytest.fixture
+def layout():
+    return WorldLayout(numpy.array([[100.0, 100.0]]), numpy.array([20.0]), numpy.array([[50.0, 60.0], [300.0, 200.0]]),
+                       (400, 300))
+
+
+def test_delta_encoding_wraps_around_losslessly():
+    values = numpy.array([[0, 65535], [65535, 0], [12, 7]], dtype=numpy.uint16)
+    assert numpy.array_equal(delta_decode(delta_encode(values)), values)
+
+
+def record_ticks(recorder, rng, ticks, count, best):
+    recorded = []
+    for tick in range(ticks):
+        values = (rng.uniform(-40, 440, (count, 2)),
+                  rng.integers(0, 360 // assets.ROTATION_STEP, count) * assets.ROTATION_STEP,
+                  rng.integers(0, 2, count),
+                  rng.random(count) < 0.7,
+                  best[tick])
+        recorder.record(*values)
+        recorded.append(values)
+    return recorded
+
+
+@pytest.mark.parametrize('best_count', [0, 2])
+def test_recorded_generation_loads_back(tmp_path, layout, best_count):
+    rng = numpy.random.default_rng(0)
+    recorder = ReplayRecorder(str(tmp_path), best_count=best_count)
+    recorder.start(3, layout)
+    best = [1, None, 4, 0]
+    recorded = record_ticks(recorder, rng, len(best), 5, best)
+    fitness = numpy.array([1.0, 5.0, 2.0, 0.0, 4.0])
+    recorder.finish(fitness)
+    recorder.close()
+
+    replay = load_generation(generation_files(str(tmp_path), [3])[0])
+    organisms = replay['organisms']
+    assert replay['generation'] == 3
+    assert list(organisms) == ([0, 1, 2, 3, 4] if not best_count else [1, 4])
+    assert numpy.array_equal(replay['fitness'], fitness[organisms])
+    scale = (max(layout.display_size) + 100) / 65535
+    for tick, (positions, angles, food_indices, alive, tick_best) in enumerate(recorded):
+        assert numpy.abs(replay['positions'][tick] - positions[organisms]).max() <= scale / 2 + 1e-9
+        assert numpy.array_equal(replay['angles'][tick], angles[organisms])
+        assert numpy.array_equal(replay['food_indices'][tick], food_indices[organisms])
+        assert numpy.array_equal(replay['alive'][tick], alive[organisms])
+        shown = list(organisms).index(tick_best) if tick_best in organisms else -1
+        assert replay['best'][tick] == shown
+    assert os.path.exists(tmp_path / 'world.npz')
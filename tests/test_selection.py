@@ -0,0 +1,64 @@
+import numpy
+import pytest
+
+from selection import BestTracker, pairs, rank, roulette, stochastic_universal, top, tournament
+
+FITNESS = numpy.array([1.0, 2.0, 3.0, 4.0])
+
+
+def frequencies(picks, size):
+    return numpy.bincount(picks, minlength=size) / len(picks)
+
+
+def test_top_returns_the_best_first():
+    assert list(top(numpy.array([3.0, 9.0, 1.0, 7.0]), 2)) == [1, 3]
+    assert list(top(numpy.array([3.0, 9.0, 1.0]), 5)) == [1, 0, 2]
+
+
+def test_roulette_is_proportionate_to_fitness():
+    picks = roulette(FITNESS, 200000, numpy.random.default_rng(0))
+    assert numpy.allclose(frequencies(picks, 4), FITNESS / FITNESS.sum(), atol=0.01)
+
+
+def test_roulette_never_picks_the_worst_negative_fitness():
+    picks = roulette(numpy.array([-5.0, -1.0, 3.0]), 10000, numpy.random.default_rng(0))
+    assert 0 not in picks
+
+
+def test_stochastic_universal_sampling_has_minimal_spread():
+    picks = stochastic_universal(FITNESS, 100, numpy.random.default_rng(0))
+    counts = numpy.bincount(picks, minlength=4)
+    assert numpy.all(numpy.abs(counts - 100 * FITNESS / FITNESS.sum()) <= 1)
+
+
+def test_rank_is_proportionate_to_rank():
+    picks = rank(numpy.array([10.0, -3.0, 500.0, 7.0]), 200000, numpy.random.default_rng(0))
+    assert numpy.allclose(frequencies(picks, 4), numpy.array([3, 1, 4, 2]) / 10, atol=0.01)
+
+
+def test_tournament_picks_the_best_contestant():
+    picks = tournament(FITNESS, 200000, numpy.random.default_rng(0), 2)
+    # The best of 2 uniform draws from 4 is organism i with probability ((i + 1)^2 - i^2) / 16.
+    assert numpy.allclose(frequencies(picks, 4), numpy.array([1, 3, 5, 7]) / 16, atol=0.01)
+
+
+@pytest.mark.parametrize('strategy', ["roulette", "sus", "rank", "tournament"])
+def test_pairs_never_pair_a_genome_with_itself(strategy):
+    picked = pairs(strategy, FITNESS, 1000, numpy.random.default_rng(0))
+    assert not numpy.any(picked[:, 0] == picked[:, 1])
+
+
+def test_pairs_end_with_a_dominant_tournament_winner():
+    fitness = numpy.array([100.0, 0.0, 0.0, 0.0])
+    picked = pairs("tournament", fitness, 1000, numpy.random.default_rng(0), tournament_size=50)
+    assert not numpy.any(picked[:, 0] == picked[:, 1])
+
+
+def test_best_tracker_follows_argmax():
+    rng = numpy.random.default_rng(0)
+    fitness = rng.random(50)
+    tracker = BestTracker()
+    for tick in range(200):
+        changed = rng.choice(50, 5, replace=False)
+        fitness[changed] += rng.normal(0, 0.5, 5)
+        assert tracker.update(fitness, changed) == int(numpy.argmax(fitness))
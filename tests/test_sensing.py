@@ -0,0 +1,56 @@
+import math
+
+import numpy
+
+from sensing import rotation, sense
+from world import index_blocks
+
+ANGLES = (0, 45, 90, -45, -90)
+SIGHT = 60
+PADDING = 10
+
+
+def brute_force_sense(position, direction, blocks, radii, display_size):
+    # The organism engine's loop: the first block a sight point is inside of wins, the map edges override it.
+    width, height = display_size
+    sights = []
+    for angle in ANGLES:
+        cos, sin = rotation(angle)
+        x = position[0] + (cos * direction[0] - sin * direction[1]) * SIGHT
+        y = position[1] + (sin * direction[0] + cos * direction[1]) * SIGHT
+        value = 0.0
+        for block, radius in zip(blocks, radii):
+            distance = math.hypot(x - block[0], y - block[1])
+            if distance <= radius:
+                value = (SIGHT - (radius - distance)) / SIGHT
+                break
+        if width <= x:
+            value = (SIGHT - (x - width)) / SIGHT
+        elif 0 >= x:
+            value = (SIGHT - abs(x)) / SIGHT
+        elif height <= y:
+            value = (SIGHT - (y - height)) / SIGHT
+        elif 0 >= y:
+            value = (SIGHT - abs(y)) / SIGHT
+        sights.append(value)
+    collided = any(math.hypot(position[0] - block[0], position[1] - block[1]) < radius + PADDING
+                   for block, radius in zip(blocks, radii))
+    return sights, collided
+
+
+def test_sense_matches_a_brute_force_loop():
+    rng = numpy.random.default_rng(0)
+    display_size = (400, 300)
+    blocks = rng.uniform(0, 400, (25, 2)) * (1, 0.75)
+    radii = rng.uniform(10, 40, 25)
+    grid = index_blocks(blocks, radii)
+    positions = rng.uniform(-20, 420, (500, 2))
+    angles = rng.uniform(0, 2 * math.pi, 500)
+    directions = numpy.column_stack([numpy.cos(angles), numpy.sin(angles)])
+
+    sights, collided = sense(positions, directions, grid, display_size, ANGLES, SIGHT, PADDING)
+    for i in range(len(positions)):
+        expected_sights, expected_collided = brute_force_sense(positions[i], directions[i], blocks, radii, display_size)
+        assert numpy.allclose(sights[i], expected_sights, rtol=0, atol=1e-12)
+        assert collided[i] == expected_collided
+    assert collided.any() and (sights > 0).any()
@@ -0,0 +1,24 @@
+import pytest
+
+from ai import default_settings, load_settings, validate_settings
+
+
+def test_defaults_are_valid():
+    validate_settings(default_settings())
+
+
+@pytest.mark.parametrize('changes', [dict(population_size=10.5), dict(workers=True), dict(headless=1),
+                                     dict(seed='1'), dict(seed=-1), dict(hidden_layers='64'),
+                                     dict(hidden_layers=[64, 0]), dict(stats_file=3), dict(profile_generation=1.5),
+                                     dict(mutation_rate=1.5), dict(mutation_scale=-0.1), dict(max_generation=-1),
+                                     dict(max_ticks=-1), dict(elite_size=0), dict(fitness_quantile=-0.5),
+                                     dict(map_size=[800]), dict(engine='gpu'), dict(unknown=1)])
+def test_invalid_settings_are_rejected(changes):
+    with pytest.raises(ValueError):
+        load_settings(**changes)
+
+
+def test_json_values_are_accepted():
+    settings = load_settings(seed=3, hidden_layers=[64, 64], map_size=[400, 300], food_spacing=12.5,
+                             stats_file='stats.csv', output_dir='runs')
+    assert settings["hidden_layers"] == [64, 64]
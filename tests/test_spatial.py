@@ -0,0 +1,44 @@
+import numpy
+import pytest
+
+from spatial import Grid
+
+
+@pytest.fixture
+def grid():
+    rng = numpy.random.default_rng(0)
+    return Grid(rng.uniform(-50, 450, (300, 2)), rng.uniform(2, 20, 300), 25)
+
+
+def brute_force(grid, point, reach):
+    # The grid returns every item whose cell is within reach of the point's cell, so every item within reach of
+    # the point has to be among them.
+    distances = numpy.hypot(*(grid.positions - point).T)
+    return set(numpy.flatnonzero(distances <= reach).tolist())
+
+
+@pytest.mark.parametrize('reach', [0, 10, 37.5, 120])
+def test_nearby_finds_every_item_within_reach(grid, reach):
+    points = numpy.random.default_rng(1).uniform(-100, 500, (200, 2))
+    for point in points:
+        items = grid.nearby(point[0], point[1], reach)
+        assert items == sorted(set(items))
+        assert brute_force(grid, point, reach) <= set(items)
+        # Only the square of cells around the point is visited, nothing beyond its corners comes back.
+        corner = numpy.sqrt(2) * (numpy.ceil(reach / grid.cell_size) + 1) * grid.cell_size
+        assert set(items) <= brute_force(grid, point, corner)
+
+
+@pytest.mark.parametrize('reach', [0, 10, 37.5, 120])
+def test_candidates_match_nearby(grid, reach):
+    points = numpy.random.default_rng(2).uniform(-100, 500, (200, 2))
+    point_index, item_index = grid.candidates(points, reach)
+    for i, point in enumerate(points):
+        assert sorted(item_index[point_index == i].tolist()) == grid.nearby(point[0], point[1], reach)
+
+
+def test_empty_grid_has_no_candidates():
+    grid = Grid(numpy.empty((0, 2)), numpy.empty(0), 10)
+    point_index, item_index = grid.candidates(numpy.array([[5.0, 5.0]]), 10)
+    assert len(grid) == 0 and len(point_index) == 0 and len(item_index) == 0
+    assert grid.nearby(5.0, 5.0, 10) == []
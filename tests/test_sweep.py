@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from genetic import Genetic
+from sweep import Sweep, grid_configs, rung_generations
+
+
+def test_grid_configs_cover_every_combination():
+    configs = grid_configs({"mutation_rate": [0.01, 0.1], "hidden_layers": [[8], [20, 50]]})
+    assert len(configs) == 4
+    assert {"mutation_rate": 0.1, "hidden_layers": [8]} in configs
+
+
+def test_rungs_grow_by_eta_up_to_max_generation():
+    assert rung_generations(10, 1, 3) == [1, 3, 9, 10]
+    assert rung_generations(9, 3, 3) == [3, 9]
+
+
+def test_swept_seed_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Sweep({}, [{"seed": 1}], str(tmp_path))
+
+
+@pytest.mark.parametrize('changes', [dict(), dict(islands=2, migration_interval=1),
+                                     dict(elitism=3, fitness_cache=True)])
+def test_halved_runs_resume_on_their_uninterrupted_trajectory(tmp_path, changes):
+    base = dict(population_size=12, max_generation=4, max_ticks=40, **changes)
+    sweep = Sweep(base, [{"mutation_rate": 0.01}, {"mutation_rate": 0.5}], str(tmp_path / 'sweep'), seed=0,
+                  workers=1, eta=2, min_generations=2)
+    best = sweep.run()[0]
+    assert len(best['history']) == 4
+
+    uninterrupted = Genetic(dict(best['settings'], output_dir=str(tmp_path / 'full'))).run()
+    assert [stat['best_fitness'] for stat in best['history']] == [stat['best_fitness'] for stat in uninterrupted]
+
+    with open(tmp_path / 'sweep' / 'results.jsonl') as stream:
+        rows = [json.loads(line) for line in stream]
+    assert [row['best_fitness'] for row in rows if row['run'] == best['run']] == \
+           [stat['best_fitness'] for stat in uninterrupted]
@@ -0,0 +1,78 @@
+import numpy
+import pytest
+
+from world import LayoutStack, WorldLayout, coverage, index_blocks, place_blocks, place_foods, scatter
+
+MAP_SIZE = (800, 600)
+BLOCK_SIZE = (40, 40)
+FOOD_WIDTH = 10
+
+
+def blocks(rng, count=15):
+    positions = place_blocks(rng, count, MAP_SIZE, BLOCK_SIZE)
+    return index_blocks(positions, numpy.full(len(positions), BLOCK_SIZE[0] / 2))
+
+
+def pairwise_distances(points):
+    return numpy.hypot(*(points[:, None] - points[None]).transpose(2, 0, 1))[numpy.triu_indices(len(points), 1)]
+
+
+def test_blocks_stay_inside_the_map_and_out_of_the_center():
+    grid = blocks(numpy.random.default_rng(0), 40)
+    assert len(grid) == 40
+    assert (grid.positions >= 20).all() and (grid.positions <= numpy.subtract(MAP_SIZE, 20)).all()
+    assert not (numpy.abs(grid.positions - numpy.divide(MAP_SIZE, 2)) < BLOCK_SIZE).all(axis=1).any()
+
+
+@pytest.mark.parametrize('placement', ["uniform", "jitter", "poisson"])
+def test_foods_keep_clear_of_the_blocks(placement):
+    rng = numpy.random.default_rng(0)
+    grid = blocks(rng)
+    foods = place_foods(rng, 300, MAP_SIZE, grid, FOOD_WIDTH, placement, 20)
+    assert len(foods) == 300
+    distances = numpy.hypot(*(foods[:, None] - grid.positions[None]).transpose(2, 0, 1))
+    assert (distances >= grid.radii + FOOD_WIDTH).all()
+
+
+@pytest.mark.parametrize('spacing', [8, 20, 35])
+def test_poisson_foods_are_at_least_the_spacing_apart(spacing):
+    rng = numpy.random.default_rng(1)
+    foods = place_foods(rng, 150, MAP_SIZE, blocks(rng), FOOD_WIDTH, "poisson", spacing)
+    assert pairwise_distances(foods).min() >= spacing
+
+
+def test_scatter_rejects_what_does_not_fit():
+    rng = numpy.random.default_rng(0)
+    with pytest.raises(ValueError):
+        scatter(rng, 10, (0, 0), (100, 100), lambda points: numpy.ones(len(points), dtype=bool), "poisson", 0)
+    with pytest.raises(ValueError):
+        scatter(rng, 500, (0, 0), (100, 100), lambda points: numpy.ones(len(points), dtype=bool), "poisson", 20,
+                rounds=5)
+
+
+def test_coverage_marks_covered_and_free_cells_exactly():
+    positions, gaps = numpy.array([[50.0, 50.0], [130.0, 40.0]]), numpy.array([20.0, 15.0])
+    cell_size = 5.0
+    cover = coverage(positions, gaps, (200, 100), cell_size)
+    corners = numpy.stack(numpy.meshgrid(numpy.arange(cover.shape[0]), numpy.arange(cover.shape[1]),
+                                         indexing='ij'), axis=-1) * cell_size
+    for (x, y), state in numpy.ndenumerate(cover):
+        square = corners[x, y] + numpy.array([[0, 0], [0, 1], [1, 0], [1, 1]]) * cell_size
+        samples = corners[x, y] + numpy.random.default_rng(x * 100 + y).random((50, 2)) * cell_size
+        near = numpy.hypot(*(samples[:, None] - positions[None]).transpose(2, 0, 1)) < gaps
+        if state == 0:
+            assert not near.any()
+        if state == 2:
+            assert (numpy.hypot(*(square[:, None] - positions[None]).transpose(2, 0, 1)) < gaps).any(axis=1).all()
+
+
+def test_layout_identity_follows_the_world():
+    rng = numpy.random.default_rng(0)
+    grid = blocks(rng)
+    foods = place_foods(rng, 50, MAP_SIZE, grid, FOOD_WIDTH)
+    layout = WorldLayout(grid.positions, grid.radii, foods, MAP_SIZE)
+    assert layout.identity == WorldLayout(grid.positions, grid.radii, foods.copy(), MAP_SIZE).identity
+    moved = foods.copy()
+    moved[0] += 1
+    assert layout.identity != WorldLayout(grid.positions, grid.radii, moved, MAP_SIZE).identity
+    assert LayoutStack([layout, layout]).identity != layout.identity
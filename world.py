@@ -0,0 +1,183 @@
+import hashlib
+import math
+
+import numpy
+
+from spatial import Grid
+
+
+def read_only(values, shape):
+    array = numpy.asarray(values, dtype=float).reshape(shape).view()
+    array.flags.writeable = False
+    return array
+
+
+def identity(*arrays):
+    digest = hashlib.blake2b(digest_size=16)
+    for array in arrays:
+        digest.update(numpy.ascontiguousarray(array).tobytes())
+    return digest.hexdigest()
+
+
+def index_blocks(positions, radii):
+    return Grid(positions, radii, 2 * max(radii, default=1))
+
+
+def jittered(rng, count, low, high):
+    # One point in each of count cells picked from a grid of nearly square cells.
+    extent = high - low
+    columns = max(1, round(math.sqrt(count * extent[0] / extent[1])))
+    rows = math.ceil(count / columns)
+    cell = extent / (columns, rows)
+    cells = rng.permutation(columns * rows)[:count]
+    return low + (numpy.column_stack([cells % columns, cells // columns]) + rng.random((count, 2))) * cell
+
+
+class DiskSampler:
+    # Poisson-disk dart throwing in bulk rounds, on a grid of cells small enough to hold one point each. The grid has a
+    # margin of two empty cells, so the neighborhood of every cell is inside it.
+
+    def __init__(self, low, high, spacing):
+        self.low, self.spacing = low, spacing
+        self.cell_size = spacing / math.sqrt(2)
+        columns, self.rows = (numpy.ceil((high - low) / self.cell_size).astype(int) + 5).tolist()
+        self.occupant = numpy.full(columns * self.rows, -1)
+        self.points = numpy.empty((0, 2))
+        # The corner cells of the 5x5 neighborhood are always at least spacing away.
+        self.neighborhood = numpy.array([i * self.rows + j for i in range(-2, 3) for j in range(-2, 3)
+                                         if abs(i) + abs(j) < 4])
+
+    def add(self, candidates, limit):
+        # A candidate is dropped when a placed point or an earlier candidate is closer than spacing.
+        cells = ((candidates - self.low) / self.cell_size).astype(int) + 2
+        cell_ids = cells[:, 0] * self.rows + cells[:, 1]
+        first = numpy.sort(numpy.unique(cell_ids, return_index=True)[1])
+        first = first[self.occupant[cell_ids[first]] < 0]
+        everything = numpy.concatenate([self.points, candidates[first]])
+        own = len(self.points) + numpy.arange(len(first))
+        self.occupant[cell_ids[first]] = own
+        neighbors = self.occupant[cell_ids[first, None] + self.neighborhood]
+        rows, columns = numpy.nonzero((neighbors >= 0) & (neighbors < own[:, None]))
+        distances = ((everything[neighbors[rows, columns]] - everything[own[rows]]) ** 2).sum(axis=1)
+        conflict = numpy.zeros(len(first), dtype=bool)
+        conflict[rows[distances < self.spacing ** 2]] = True
+        self.occupant[cell_ids[first]] = -1
+        accepted = first[~conflict][:limit]
+        self.occupant[cell_ids[accepted]] = len(self.points) + numpy.arange(len(accepted))
+        self.points = numpy.concatenate([self.points, candidates[accepted]])
+        return candidates[accepted]
+
+
+def coverage(positions, gaps, map_size, cell_size):
+    # Raster of the map: 0 where no block is within its gap, 2 where the whole cell is, 1 on the edges that need an
+    # exact test.
+    shape = numpy.ceil(numpy.asarray(map_size) / cell_size).astype(int)
+    cover = numpy.zeros(shape, dtype=numpy.int8)
+    if not len(positions):
+        return cover
+    window = numpy.arange(math.ceil(2 * gaps.max() / cell_size) + 2)
+    first = numpy.floor((positions - gaps[:, None]) / cell_size).astype(int)
+    columns, rows = first[:, 0, None] + window, first[:, 1, None] + window
+    edges = [cells * cell_size - positions[:, axis, None] for axis, cells in enumerate((columns, rows))]
+    near = [numpy.clip(0, edge, edge + cell_size) ** 2 for edge in edges]
+    far = [numpy.maximum(edge ** 2, (edge + cell_size) ** 2) for edge in edges]
+    limit = gaps[:, None, None] ** 2
+    state = ((near[0][:, :, None] + near[1][:, None, :] < limit).astype(numpy.int8) +
+             (far[0][:, :, None] + far[1][:, None, :] < limit))
+    valid = (((columns >= 0) & (columns < shape[0]))[:, :, None] & ((rows >= 0) & (rows < shape[1]))[:, None, :] &
+             (state > 0))
+    block_index, column_index, row_index = numpy.nonzero(valid)
+    numpy.maximum.at(cover, (columns[block_index, column_index], rows[block_index, row_index]), state[valid])
+    return cover
+
+
+def scatter(rng, count, low, high, accept, placement="uniform", spacing=0.0, rounds=100):
+    # Candidates are drawn in bulk and filtered at once, only the shortfall is drawn again, oversampled by the
+    # acceptance rate of the previous round.
+    if placement not in ("uniform", "jitter", "poisson") or (placement == "poisson" and spacing <= 0):
+        raise ValueError('Unknown placement {} with spacing {}'.format(placement, spacing))
+    low, high = numpy.asarray(low, dtype=float), numpy.asarray(high, dtype=float)
+    sampler = DiskSampler(low, high, spacing) if placement == "poisson" else None
+    points, rate = numpy.empty((0, 2)), 0.5
+    for _ in range(rounds):
+        missing = count - len(points)
+        if missing <= 0:
+            break
+        if placement == "jitter":
+            candidates = jittered(rng, missing, low, high)
+        else:
+            candidates = rng.uniform(low, high, (int(1.1 * missing / rate) + 64, 2))
+        drawn = len(candidates)
+        candidates = candidates[accept(candidates)]
+        if sampler:
+            candidates = sampler.add(candidates, missing)
+        rate = max(len(candidates) / drawn, 0.01)
+        points = numpy.concatenate([points, candidates[:missing]])
+    if len(points) < count:
+        raise ValueError('Only {} of {} objects fit on the map, use a larger map_size or fewer objects'.format(
+            len(points), count))
+    return points
+
+
+def place_blocks(rng, count, map_size, block_size, padding=20):
+    # Blocks stay out of the center, where the organisms start.
+    center, block_size = numpy.asarray(map_size) / 2, numpy.asarray(block_size)
+    return scatter(rng, count, (padding, padding), numpy.subtract(map_size, padding),
+                   lambda points: ~(numpy.abs(points - center) < block_size).all(axis=1))
+
+
+def place_foods(rng, count, map_size, block_grid, food_width, placement="uniform", spacing=0.0, padding=20):
+    cell_size = max(food_width / 4, 1)
+    cover = coverage(block_grid.positions, block_grid.radii + food_width, map_size, cell_size)
+
+    def clear_of_blocks(points):
+        cells = numpy.minimum((points / cell_size).astype(int), numpy.array(cover.shape) - 1)
+        state = cover[cells[:, 0], cells[:, 1]]
+        accepted = state == 0
+        edge = numpy.flatnonzero(state == 1)
+        if len(edge):
+            point_index, block_index = block_grid.candidates(points[edge], block_grid.max_radius + food_width)
+            gap = block_grid.radii[block_index] + food_width
+            hit = ((points[edge][point_index] - block_grid.positions[block_index]) ** 2).sum(axis=1) < gap ** 2
+            accepted[edge] = True
+            accepted[edge[point_index[hit]]] = False
+        return accepted
+
+    return scatter(rng, count, (padding, padding), numpy.subtract(map_size, padding), clear_of_blocks, placement,
+                   spacing)
+
+
+class WorldLayout:
+
+    def __init__(self, block_positions, block_radii, food_positions, display_size):
+        self.block_positions = read_only(block_positions, (-1, 2))
+        self.block_radii = read_only(block_radii, (-1,))
+        self.food_positions = read_only(food_positions, (-1, 2))
+        self.display_size = tuple(display_size)
+        self.block_grid = index_blocks(self.block_positions, self.block_radii)
+        self.food_table = read_only(self.food_positions, (1, -1, 2))
+        self.offsets = read_only((0, 0), (1, 2))
+        self.identity = identity(self.block_positions, self.block_radii, self.food_positions,
+                                 numpy.array(self.display_size, dtype=float))
+
+    @property
+    def layouts(self):
+        return [self]
+
+
+class LayoutStack:
+
+    def __init__(self, layouts):
+        self.layouts = list(layouts)
+        self.display_size = self.layouts[0].display_size
+        # Each layout gets its own region of one plane, far enough apart that an organism never sees or touches the
+        # blocks of another layout, so a single grid serves all of them.
+        spacing = 2 * max(self.display_size)
+        self.offsets = read_only([(i * spacing, 0) for i in range(len(self.layouts))], (-1, 2))
+        self.block_positions = read_only(numpy.concatenate(
+            [layout.block_positions + offset for layout, offset in zip(self.layouts, self.offsets)]), (-1, 2))
+        self.block_radii = read_only(numpy.concatenate([layout.block_radii for layout in self.layouts]), (-1,))
+        self.food_table = read_only(numpy.stack([layout.food_positions for layout in self.layouts]),
+                                    (len(self.layouts), -1, 2))
+        self.block_grid = index_blocks(self.block_positions, self.block_radii)
+        self.identity = identity(numpy.array([layout.identity for layout in self.layouts]))